@@ -6,7 +6,7 @@
 
 import time
 import logging
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 
 class AlertSystem:
     def __init__(self, config_manager):
@@ -28,33 +28,41 @@ class AlertSystem:
         # 告警冷却时间（秒）
         self.cooldown_period = self.config.get_alert_cooldown()
         
+        # 温度阈值缓存（避免每次轮询都读取配置）
+        self.thresholds = self._load_thresholds()
+        
         # 自定义告警动作
         self.custom_alert_actions = {}
         
         self.logger.info("告警系统初始化完成")
 
-    def check_thresholds(self, temperatures: Dict[str, Optional[float]]) -> List[str]:
+    def check_thresholds(self, temperatures: Dict[str, Optional[float]],
+                         now: Optional[float] = None) -> List[Tuple[str, str]]:
         """
-        检查温度是否超过阈值，返回告警消息列表
+        检查温度是否超过阈值，返回告警列表
         
         :param temperatures: 当前温度数据字典
-        :return: 告警消息列表（如：["CPU温度过高: 90°C (阈值: 85°C)"]）
+        :param now: 当前Unix时间戳（由调用方在每轮采样时传入，默认取 time.time()）
+        :return: (设备名, 告警消息) 列表（如：[("CPU", "CPU温度过高: 90°C (阈值: 85°C)")]）
         """
         alerts = []
-        current_time = time.time()
+        current_time = time.time() if now is None else now
+        log = self.logger
+        debug_enabled = log.isEnabledFor(logging.DEBUG)
         
         for device, temp in temperatures.items():
             if temp is None:
                 continue
                 
-            threshold = self.config.get_threshold(device)
+            threshold = self.thresholds[device]
             
             # 如果温度超过阈值
             if temp > threshold:
                 # 检查是否在冷却期内
                 last_triggered = self.alert_states[device]['last_triggered']
                 if current_time - last_triggered < self.cooldown_period:
-                    self.logger.debug(f"{device}告警在冷却期内，跳过")
+                    if debug_enabled:
+                        log.debug("%s告警在冷却期内，跳过", device)
                     continue
                 
                 # 更新告警状态
@@ -63,22 +71,26 @@ class AlertSystem:
                 
                 # 生成告警消息
                 alert_msg = f"{device}温度过高: {temp}°C (阈值: {threshold}°C)"
-                alerts.append(alert_msg)
+                alerts.append((device, alert_msg))
                 
                 # 执行自定义告警动作（如果存在）
                 if device in self.custom_alert_actions:
-                    self.logger.info(f"执行{device}的自定义告警动作")
+                    log.info("执行%s的自定义告警动作", device)
                     self.custom_alert_actions[device]()
             else:
                 # 如果温度恢复正常
                 if self.alert_states[device]['active']:
                     self.alert_states[device]['active'] = False
                     recovery_msg = f"{device}温度已恢复正常: {temp}°C"
-                    alerts.append(recovery_msg)
-                    self.logger.info(recovery_msg)
+                    alerts.append((device, recovery_msg))
+                    log.info(recovery_msg)
         
         return alerts
 
+    def _load_thresholds(self) -> Dict[str, float]:
+        """从配置读取各设备的温度阈值"""
+        return {device: self.config.get_threshold(device) for device in self.alert_states}
+
     def is_alert_active(self, device: str) -> bool:
         """
         检查指定设备是否有活跃告警
@@ -122,4 +134,5 @@ class AlertSystem:
         更新配置（当配置改变时调用）
         """
         self.cooldown_period = self.config.get_alert_cooldown()
+        self.thresholds = self._load_thresholds()
         self.logger.info(f"告警系统配置已更新，冷却时间: {self.cooldown_period}秒")
\ No newline at end of file
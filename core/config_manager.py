@@ -6,10 +6,17 @@
 
 import configparser
 import os
+import io
 import json
 import logging
+import threading
 from typing import Dict, Any, Optional, Union
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 class ConfigManager:
     def __init__(self, config_file: str = "settings.ini"):
         """
@@ -21,6 +28,18 @@ class ConfigManager:
         self.config_file = config_file
         self.config = configparser.ConfigParser()
         self.defaults = self._get_default_config()
+        # 已解析并转换类型的配置值缓存（getter直接读取，避免重复解析）
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        # 上次加载/保存时配置文件的修改时间（未变化时跳过重新解析）
+        self._mtime = 0.0
+        
+        # 延迟保存（合并连续的setter写入）
+        # _save_lock 保护配置内容与保存状态；_write_lock 串行化文件写入，
+        # 加锁顺序固定为先 _write_lock 后 _save_lock
+        self._dirty = False
+        self._save_timer = None
+        self._save_lock = threading.Lock()
+        self._write_lock = threading.Lock()
         
         # 确保配置文件存在
         if not os.path.exists(self.config_file):
@@ -47,7 +66,10 @@ class ConfigManager:
             'Appearance': {
                 'theme': 'dark',
                 'font_size': 10,
-                'opacity': 0.85
+                'opacity': 0.85,
+                'max_redraw_rate': 10.0,  # 悬浮窗最大刷新频率（次/秒）
+                'ui_refresh_hz': 2.0,     # 悬浮窗定时刷新频率（次/秒）
+                'tray_refresh_hz': 0.1    # 托盘图标定时刷新频率（次/秒）
             },
             'Hardware': {
                 'monitor_cpu': True,
@@ -63,24 +85,158 @@ class ConfigManager:
         self.save_config()
 
     def load_config(self):
-        """加载配置文件"""
+        """加载配置文件（文件未修改时跳过）"""
+        try:
+            mtime = os.stat(self.config_file).st_mtime
+        except OSError:
+            mtime = 0.0
+        if self._cache and mtime and mtime == self._mtime:
+            return
+        
         try:
             self.config.read(self.config_file)
+            self._mtime = mtime
             self.logger.info(f"配置文件加载成功: {self.config_file}")
         except Exception as e:
             self.logger.error(f"加载配置文件失败: {str(e)}")
             # 回退到默认配置
             self.config.read_dict(self.defaults)
+        
+        self._build_cache()
+
+    def _build_cache(self):
+        """
+        将配置解析为按默认值类型转换后的字典缓存
+        缺失或无效的配置项使用默认值，并写回配置文件
+        """
+        cache = {}
+        missing = False
+        for section, options in self.defaults.items():
+            values = {}
+            for key, default_value in options.items():
+                try:
+                    values[key] = self._read_typed(section, key, default_value)
+                except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
+                    values[key] = default_value
+                    if not self.config.has_section(section):
+                        self.config.add_section(section)
+                    self.config.set(section, key, self._format_value(default_value))
+                    missing = True
+            cache[section] = values
+        self._cache = cache
+        
+        if missing:
+            self.save_config()
+
+    def _read_typed(self, section: str, key: str, default_value: Any) -> Any:
+        """按默认值的类型读取配置项"""
+        if isinstance(default_value, bool):
+            return self.config.getboolean(section, key)
+        if isinstance(default_value, int):
+            return self.config.getint(section, key)
+        if isinstance(default_value, float):
+            return self.config.getfloat(section, key)
+        return self.config.get(section, key)
+
+    @staticmethod
+    def _coerce_value(default_value: Any, value: Any) -> Any:
+        """将配置值转换为默认值的类型（与 _read_typed 一致）"""
+        if isinstance(default_value, bool):
+            if isinstance(value, str):
+                state = configparser.ConfigParser.BOOLEAN_STATES.get(value.lower())
+                if state is None:
+                    raise ValueError(f"无效的布尔值: {value}")
+                return state
+            return bool(value)
+        if isinstance(default_value, int):
+            return int(value)
+        if isinstance(default_value, float):
+            return float(value)
+        return str(value)
+
+    @staticmethod
+    def _format_value(value: Any) -> str:
+        """将配置值转换为INI中的字符串形式"""
+        if isinstance(value, bool):
+            return str(value).lower()
+        return str(value)
 
     def save_config(self):
         """保存配置文件"""
+        with self._write_lock:
+            with self._save_lock:
+                data = self._snapshot()
+            self._write_file(data)
+
+    def _snapshot(self) -> str:
+        """将当前配置序列化为文本（调用方需持有 _save_lock）"""
+        buf = io.StringIO()
+        self.config.write(buf)
+        return buf.getvalue()
+
+    def _write_file(self, data: str):
+        """
+        将序列化后的配置写入文件（调用方需持有 _write_lock）
+        
+        :param data: 配置文本
+        """
         try:
             with open(self.config_file, 'w') as configfile:
-                self.config.write(configfile)
+                configfile.write(data)
+            # 记录本进程写入后的修改时间，避免重新加载自己的写入
+            self._mtime = os.stat(self.config_file).st_mtime
             self.logger.info(f"配置文件已保存: {self.config_file}")
         except Exception as e:
             self.logger.error(f"保存配置文件失败: {str(e)}")
 
+    def _set_value(self, section: str, key: str, value: Any):
+        """
+        修改一项配置（同时更新缓存），并安排延迟保存
+        
+        :param section: 配置节
+        :param key: 配置项
+        :param value: 新值
+        """
+        # 缓存中保存与读取配置时相同类型的值，避免 getter 返回的类型随调用方变化
+        default_value = self.defaults.get(section, {}).get(key)
+        if default_value is not None:
+            value = self._coerce_value(default_value, value)
+        with self._save_lock:
+            if not self.config.has_section(section):
+                self.config.add_section(section)
+            self.config.set(section, key, self._format_value(value))
+            self._cache[section][key] = value
+        self._mark_dirty()
+
+    def _mark_dirty(self):
+        """标记配置已修改，并在短暂延迟后统一写入文件"""
+        with self._save_lock:
+            self._dirty = True
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(0.5, self._flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _flush(self):
+        """如有未保存的修改则写入文件（正在进行的写入完成后才返回）"""
+        with self._write_lock:
+            with self._save_lock:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                self._save_timer = None
+                data = self._snapshot()
+            self._write_file(data)
+
+    def flush(self):
+        """立即写入所有未保存的修改（退出或导出前调用）"""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+        self._flush()
+
     # ================== 阈值配置方法 ==================
     def get_threshold(self, device: str) -> float:
         """
@@ -89,12 +245,7 @@ class ConfigManager:
         :param device: 设备名称（'CPU', 'GPU', 'SSD'）
         :return: 温度阈值（摄氏度）
         """
-        try:
-            return self.config.getfloat('Thresholds', device)
-        except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
-            default_value = self.defaults['Thresholds'][device]
-            self.set_threshold(device, default_value)
-            return default_value
+        return self._cache['Thresholds'][device]
 
     def set_threshold(self, device: str, value: float):
         """
@@ -103,140 +254,97 @@ class ConfigManager:
         :param device: 设备名称
         :param value: 温度阈值（摄氏度）
         """
-        if not self.config.has_section('Thresholds'):
-            self.config.add_section('Thresholds')
-        self.config.set('Thresholds', device, str(value))
-        self.save_config()
+        self._set_value('Thresholds', device, value)
 
     # ================== 常规配置方法 ==================
     def get_update_interval(self) -> float:
         """获取更新间隔（秒）"""
-        try:
-            return self.config.getfloat('General', 'update_interval')
-        except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
-            default_value = self.defaults['General']['update_interval']
-            self.set_update_interval(default_value)
-            return default_value
+        return self._cache['General']['update_interval']
 
     def set_update_interval(self, value: float):
         """设置更新间隔（秒）"""
-        if not self.config.has_section('General'):
-            self.config.add_section('General')
-        self.config.set('General', 'update_interval', str(value))
-        self.save_config()
+        self._set_value('General', 'update_interval', value)
 
     def get_start_minimized(self) -> bool:
         """获取是否最小化启动"""
-        try:
-            return self.config.getboolean('General', 'start_minimized')
-        except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
-            default_value = self.defaults['General']['start_minimized']
-            self.set_start_minimized(default_value)
-            return default_value
+        return self._cache['General']['start_minimized']
 
     def set_start_minimized(self, value: bool):
         """设置是否最小化启动"""
-        if not self.config.has_section('General'):
-            self.config.add_section('General')
-        self.config.set('General', 'start_minimized', str(value).lower())
-        self.save_config()
+        self._set_value('General', 'start_minimized', value)
 
     def get_log_temperatures(self) -> bool:
         """获取是否记录温度日志"""
-        try:
-            return self.config.getboolean('General', 'log_temperatures')
-        except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
-            default_value = self.defaults['General']['log_temperatures']
-            self.set_log_temperatures(default_value)
-            return default_value
+        return self._cache['General']['log_temperatures']
 
     def set_log_temperatures(self, value: bool):
         """设置是否记录温度日志"""
-        if not self.config.has_section('General'):
-            self.config.add_section('General')
-        self.config.set('General', 'log_temperatures', str(value).lower())
-        self.save_config()
+        self._set_value('General', 'log_temperatures', value)
 
     def get_log_path(self) -> str:
         """获取日志文件路径"""
-        try:
-            return self.config.get('General', 'log_file')
-        except (configparser.NoSectionError, configparser.NoOptionError):
-            default_value = self.defaults['General']['log_file']
-            self.set_log_path(default_value)
-            return default_value
+        return self._cache['General']['log_file']
 
     def set_log_path(self, value: str):
         """设置日志文件路径"""
-        if not self.config.has_section('General'):
-            self.config.add_section('General')
-        self.config.set('General', 'log_file', value)
-        self.save_config()
+        self._set_value('General', 'log_file', value)
 
     def get_alert_cooldown(self) -> int:
         """获取告警冷却时间（秒）"""
-        try:
-            return self.config.getint('General', 'alert_cooldown')
-        except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
-            default_value = self.defaults['General']['alert_cooldown']
-            self.set_alert_cooldown(default_value)
-            return default_value
+        return self._cache['General']['alert_cooldown']
 
     def set_alert_cooldown(self, value: int):
         """设置告警冷却时间（秒）"""
-        if not self.config.has_section('General'):
-            self.config.add_section('General')
-        self.config.set('General', 'alert_cooldown', str(value))
-        self.save_config()
+        self._set_value('General', 'alert_cooldown', value)
 
     # ================== 外观配置方法 ==================
     def get_theme(self) -> str:
         """获取当前主题"""
-        try:
-            return self.config.get('Appearance', 'theme')
-        except (configparser.NoSectionError, configparser.NoOptionError):
-            default_value = self.defaults['Appearance']['theme']
-            self.set_theme(default_value)
-            return default_value
+        return self._cache['Appearance']['theme']
 
     def set_theme(self, value: str):
         """设置主题"""
-        if not self.config.has_section('Appearance'):
-            self.config.add_section('Appearance')
-        self.config.set('Appearance', 'theme', value)
-        self.save_config()
+        self._set_value('Appearance', 'theme', value)
 
     def get_font_size(self) -> int:
         """获取字体大小"""
-        try:
-            return self.config.getint('Appearance', 'font_size')
-        except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
-            default_value = self.defaults['Appearance']['font_size']
-            self.set_font_size(default_value)
-            return default_value
+        return self._cache['Appearance']['font_size']
 
     def set_font_size(self, value: int):
         """设置字体大小"""
-        if not self.config.has_section('Appearance'):
-            self.config.add_section('Appearance')
-        self.config.set('Appearance', 'font_size', str(value))
-        self.save_config()
+        self._set_value('Appearance', 'font_size', value)
 
     def get_opacity(self) -> float:
         """获取窗口不透明度（0.0-1.0）"""
-        try:
-            return self.config.getfloat('Appearance', 'opacity')
-        except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
-            default_value = self.defaults['Appearance']['opacity']
-            self.set_opacity(default_value)
-            return default_value
+        return self._cache['Appearance']['opacity']
 
     def set_opacity(self, value: float):
         """设置窗口不透明度"""
-        if not self.config.has_section('Appearance'):
-            self.config.add_section('Appearance')
-        self.config.set('Appearance', 'opacity', str(value))
-        self.save_config()
+        self._set_value('Appearance', 'opacity', value)
+
+    def get_max_redraw_rate(self) -> float:
+        """获取悬浮窗最大刷新频率（次/秒）"""
+        return self._cache['Appearance']['max_redraw_rate']
+
+    def set_max_redraw_rate(self, value: float):
+        """设置悬浮窗最大刷新频率（次/秒）"""
+        self._set_value('Appearance', 'max_redraw_rate', value)
+
+    def get_ui_refresh_hz(self) -> float:
+        """获取悬浮窗定时刷新频率（次/秒）"""
+        return self._cache['Appearance']['ui_refresh_hz']
+
+    def set_ui_refresh_hz(self, value: float):
+        """设置悬浮窗定时刷新频率（次/秒）"""
+        self._set_value('Appearance', 'ui_refresh_hz', value)
+
+    def get_tray_refresh_hz(self) -> float:
+        """获取托盘图标定时刷新频率（次/秒）"""
+        return self._cache['Appearance']['tray_refresh_hz']
+
+    def set_tray_refresh_hz(self, value: float):
+        """设置托盘图标定时刷新频率（次/秒）"""
+        self._set_value('Appearance', 'tray_refresh_hz', value)
 
     # ================== 硬件配置方法 ==================
     def get_monitor_state(self, device: str) -> bool:
@@ -246,12 +354,7 @@ class ConfigManager:
         :param device: 设备名称（'cpu', 'gpu', 'ssd'）
         :return: 是否监控
         """
-        try:
-            return self.config.getboolean('Hardware', f'monitor_{device.lower()}')
-        except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
-            default_value = self.defaults['Hardware'][f'monitor_{device.lower()}']
-            self.set_monitor_state(device, default_value)
-            return default_value
+        return self._cache['Hardware'][f'monitor_{device.lower()}']
 
     def set_monitor_state(self, device: str, value: bool):
         """
@@ -260,21 +363,23 @@ class ConfigManager:
         :param device: 设备名称
         :param value: 是否监控
         """
-        if not self.config.has_section('Hardware'):
-            self.config.add_section('Hardware')
-        self.config.set('Hardware', f'monitor_{device.lower()}', str(value).lower())
-        self.save_config()
+        self._set_value('Hardware', f'monitor_{device.lower()}', value)
 
     # ================== 高级配置方法 ==================
     def export_config(self, file_path: str):
         """导出配置到JSON文件"""
         try:
+            self.flush()
             config_dict = {}
             for section in self.config.sections():
                 config_dict[section] = dict(self.config.items(section))
             
-            with open(file_path, 'w') as f:
-                json.dump(config_dict, f, indent=4)
+            if orjson is not None:
+                with open(file_path, 'wb') as f:
+                    f.write(orjson.dumps(config_dict, option=orjson.OPT_INDENT_2))
+            else:
+                with open(file_path, 'w') as f:
+                    json.dump(config_dict, f, indent=4)
             
             self.logger.info(f"配置已导出到 {file_path}")
             return True
@@ -285,8 +390,12 @@ class ConfigManager:
     def import_config(self, file_path: str):
         """从JSON文件导入配置"""
         try:
-            with open(file_path, 'r') as f:
-                config_dict = json.load(f)
+            if orjson is not None:
+                with open(file_path, 'rb') as f:
+                    config_dict = orjson.loads(f.read())
+            else:
+                with open(file_path, 'r') as f:
+                    config_dict = json.load(f)
             
             for section, options in config_dict.items():
                 if not self.config.has_section(section):
@@ -294,6 +403,7 @@ class ConfigManager:
                 for key, value in options.items():
                     self.config.set(section, key, str(value))
             
+            self._build_cache()
             self.save_config()
             self.logger.info(f"配置已从 {file_path} 导入")
             return True
@@ -304,5 +414,6 @@ class ConfigManager:
     def reset_to_defaults(self):
         """重置为默认配置"""
         self.config.read_dict(self.defaults)
+        self._build_cache()
         self.save_config()
         self.logger.info("已重置为默认配置")
\ No newline at end of file
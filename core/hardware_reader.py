@@ -4,16 +4,104 @@
 负责从系统获取CPU、GPU和SSD的温度数据
 """
 
-import wmi
-import GPUtil
-import psutil
 import logging
 import subprocess
 import re
+import os
+import sys
+import ctypes
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from utils.helpers import bytes_to_human
 
+if sys.platform.startswith("linux"):
+    import fcntl
+
+# 温度解析正则（预编译）
+# 单次扫描整个 smartctl 输出，"." 不跨行，等价于逐行查找含 Temperature 的行
+_SSD_TEMP_RE = re.compile(r"Temperature.*?(\d+)\s+Celsius")
+_MACOS_SSD_TEMP_RE = re.compile(r"Temperature: (\d+) C")
+
+# 后台轮询结果超过该倍数的轮询间隔未更新时，视为传感器读取卡住
+STALE_FACTOR = 3
+# 单次传感器读取（子进程、并发任务）的最长等待时间（秒）
+SENSOR_TIMEOUT = 5.0
+
+# ================== NVMe ioctl 常量 ==================
+# Linux: NVME_IOCTL_ADMIN_CMD = _IOWR('N', 0x41, struct nvme_admin_cmd)
+NVME_IOCTL_ADMIN_CMD = 0xC0484E41
+NVME_ADMIN_GET_LOG_PAGE = 0x02
+NVME_LOG_SMART = 0x02
+NVME_SMART_LOG_SIZE = 512
+
+# Windows: IOCTL_STORAGE_QUERY_PROPERTY / StorageDeviceTemperatureProperty
+IOCTL_STORAGE_QUERY_PROPERTY = 0x002D1400
+STORAGE_DEVICE_TEMPERATURE_PROPERTY = 52   # STORAGE_PROPERTY_ID::StorageDeviceTemperatureProperty
+PROPERTY_STANDARD_QUERY = 0
+
+
+class NvmeAdminCmd(ctypes.Structure):
+    """struct nvme_admin_cmd（见 linux/nvme_ioctl.h）"""
+    _fields_ = [
+        ('opcode', ctypes.c_uint8),
+        ('flags', ctypes.c_uint8),
+        ('rsvd1', ctypes.c_uint16),
+        ('nsid', ctypes.c_uint32),
+        ('cdw2', ctypes.c_uint32),
+        ('cdw3', ctypes.c_uint32),
+        ('metadata', ctypes.c_uint64),
+        ('addr', ctypes.c_uint64),
+        ('metadata_len', ctypes.c_uint32),
+        ('data_len', ctypes.c_uint32),
+        ('cdw10', ctypes.c_uint32),
+        ('cdw11', ctypes.c_uint32),
+        ('cdw12', ctypes.c_uint32),
+        ('cdw13', ctypes.c_uint32),
+        ('cdw14', ctypes.c_uint32),
+        ('cdw15', ctypes.c_uint32),
+        ('timeout_ms', ctypes.c_uint32),
+        ('result', ctypes.c_uint32),
+    ]
+
+
+class StoragePropertyQuery(ctypes.Structure):
+    """STORAGE_PROPERTY_QUERY（见 winioctl.h）"""
+    _fields_ = [
+        ('PropertyId', ctypes.c_uint32),
+        ('QueryType', ctypes.c_uint32),
+        ('AdditionalParameters', ctypes.c_ubyte * 1),
+    ]
+
+
+class StorageTemperatureInfo(ctypes.Structure):
+    """STORAGE_TEMPERATURE_INFO（见 winioctl.h）"""
+    _fields_ = [
+        ('Index', ctypes.c_uint16),
+        ('Temperature', ctypes.c_int16),
+        ('OverThreshold', ctypes.c_int16),
+        ('UnderThreshold', ctypes.c_int16),
+        ('OverThresholdChangable', ctypes.c_ubyte),
+        ('UnderThresholdChangable', ctypes.c_ubyte),
+        ('EventGenerated', ctypes.c_ubyte),
+        ('Reserved0', ctypes.c_ubyte),
+        ('Reserved1', ctypes.c_uint32),
+    ]
+
+
+class StorageTemperatureDataDescriptor(ctypes.Structure):
+    """STORAGE_TEMPERATURE_DATA_DESCRIPTOR（见 winioctl.h，TemperatureInfo 位于偏移24处）"""
+    _fields_ = [
+        ('Version', ctypes.c_uint32),
+        ('Size', ctypes.c_uint32),
+        ('CriticalTemperature', ctypes.c_int16),
+        ('WarningTemperature', ctypes.c_int16),
+        ('InfoCount', ctypes.c_uint16),
+        ('Reserved0', ctypes.c_ubyte * 2),
+        ('Reserved1', ctypes.c_uint32 * 2),
+        ('TemperatureInfo', StorageTemperatureInfo * 1),
+    ]
+
 class HardwareReader:
     def __init__(self):
         """
@@ -23,13 +111,25 @@ class HardwareReader:
         self.cpu_temp = None
         self.gpu_temp = None
         self.ssd_temp = None
-        self.last_update = 0
-        self.update_interval = 2  # 最小更新间隔（秒）
+        # NVMe ioctl 读取失败后不再重试，直接使用 smartctl
+        self._nvme_ioctl_available = True
+        
+        # 并发读取GPU/SSD温度的线程池（CPU的WMI读取在调用线程中进行）
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="SensorReader")
+        # 各设备尚未完成的读取任务，读取卡住时不重复提交
+        self._pending = {}
         
         # 初始化WMI连接
         self.wmi_conn = None
+        self._cpu_sensors = []
         self._init_wmi()
         
+        # 优先使用NVML直接读取GPU温度；不可用时回退到GPUtil（首次读取时才导入）
+        self._nvml = None
+        self._gpu_handle = None
+        self._GPUtil = None
+        self._init_gpu()
+        
         # 检测硬件可用性
         self.has_cpu = True
         self.has_gpu = True
@@ -41,17 +141,55 @@ class HardwareReader:
         self.ssd_name = "未知SSD"
         self._detect_hardware()
         
+        # 后台轮询：由独立线程读取传感器，get_all_temperatures 直接返回最近一次结果
+        # 每个设备单独记录最近一次读取完成的时间，只有卡住的设备才会过期
+        self._latest = {'CPU': None, 'GPU': None, 'SSD': None}
+        self._latest_times = {'CPU': None, 'GPU': None, 'SSD': None}
+        self._poll_interval = 1.0
+        self._poll_stop = threading.Event()
+        self._poller = None
+        self._stale_logged = set()
+        
         self.logger.info("硬件读取器初始化完成")
 
     def _init_wmi(self):
-        """初始化WMI连接"""
+        """初始化WMI连接（仅Windows，按需导入wmi模块）"""
+        if sys.platform != "win32":
+            return
+        
         try:
+            import wmi
             self.wmi_conn = wmi.WMI(namespace="root\\OpenHardwareMonitor")
             self.logger.info("WMI连接已建立")
+            self._resolve_cpu_sensors()
         except Exception as e:
             self.logger.error(f"无法建立WMI连接: {str(e)}")
             self.wmi_conn = None
 
+    def _init_gpu(self):
+        """初始化NVML（进程内C接口，避免GPUtil每次启动nvidia-smi子进程）"""
+        try:
+            import pynvml
+            pynvml.nvmlInit()
+            # 初始化成功后即记录，确保获取设备失败时也能在 close() 中关闭NVML
+            self._nvml = pynvml
+            self._gpu_handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+            self.logger.info("NVML已初始化，将用于读取GPU温度")
+        except ImportError:
+            self.logger.info("pynvml模块未安装，将使用GPUtil读取GPU温度")
+        except Exception as e:
+            self.logger.warning(f"NVML初始化失败，将使用GPUtil读取GPU温度: {str(e)}")
+            self._gpu_handle = None
+
+    def _resolve_cpu_sensors(self):
+        """枚举一次CPU温度传感器并缓存其COM对象，避免每次读取都重新查询WMI"""
+        self._cpu_sensors = [
+            sensor.ole_object
+            for sensor in self.wmi_conn.Sensor(SensorType="Temperature")
+            if "CPU" in sensor.Name
+        ]
+        self.logger.info(f"找到 {len(self._cpu_sensors)} 个CPU温度传感器")
+
     def _detect_ssd(self):
         """检测SSD并确定温度读取方法"""
         self.has_ssd = False
@@ -64,7 +202,8 @@ class HardwareReader:
                 result = subprocess.run(
                     ["smartctl", "--version"],
                     capture_output=True,
-                    text=True
+                    text=True,
+                    timeout=SENSOR_TIMEOUT
                 )
                 if result.returncode == 0:
                     self.has_ssd = True
@@ -87,7 +226,8 @@ class HardwareReader:
                 result = subprocess.run(
                     ["system_profiler", "SPSerialATADataType"],
                     capture_output=True,
-                    text=True
+                    text=True,
+                    timeout=SENSOR_TIMEOUT
                 )
                 if "SSD" in result.stdout:
                     self.has_ssd = True
@@ -116,14 +256,13 @@ class HardwareReader:
                         result = subprocess.run(
                             ["smartctl", "-A", device],
                             capture_output=True,
-                            text=True
+                            text=True,
+                            timeout=SENSOR_TIMEOUT
                         )
                         if result.returncode == 0:
-                            for line in result.stdout.splitlines():
-                                if "Temperature" in line:
-                                    match = re.search(r"(\d+)\s+Celsius", line)
-                                    if match:
-                                        return float(match.group(1))
+                            match = _SSD_TEMP_RE.search(result.stdout)
+                            if match:
+                                return float(match.group(1))
                     except:
                         continue
             
@@ -144,9 +283,10 @@ class HardwareReader:
                 result = subprocess.run(
                     ["system_profiler", "SPSerialATADataType"],
                     capture_output=True,
-                    text=True
+                    text=True,
+                    timeout=SENSOR_TIMEOUT
                 )
-                match = re.search(r"Temperature: (\d+) C", result.stdout)
+                match = _MACOS_SSD_TEMP_RE.search(result.stdout)
                 if match:
                     return float(match.group(1))
             
@@ -161,13 +301,20 @@ class HardwareReader:
             return None
             
         try:
-            sensors = self.wmi_conn.Sensor(SensorType="Temperature")
-            for sensor in sensors:
-                if "CPU" in sensor.Name and sensor.Value is not None:
-                    return float(sensor.Value)
+            # 传感器可能在启动后才出现（如OpenHardwareMonitor晚于本程序启动）
+            if not self._cpu_sensors:
+                self._resolve_cpu_sensors()
+            
+            for sensor in self._cpu_sensors:
+                sensor.Refresh_()
+                value = sensor.Properties_("Value").Value
+                if value is not None:
+                    return float(value)
             return None
         except Exception as e:
             self.logger.error(f"获取CPU温度失败: {str(e)}")
+            # 传感器对象可能已失效，下次重新枚举
+            self._cpu_sensors = []
             return None
 
     def get_gpu_temp(self) -> float:
@@ -176,7 +323,21 @@ class HardwareReader:
             return None
             
         try:
-            gpus = GPUtil.getGPUs()
+            if self._gpu_handle is not None:
+                return float(self._nvml.nvmlDeviceGetTemperature(
+                    self._gpu_handle, self._nvml.NVML_TEMPERATURE_GPU
+                ))
+            
+            if self._GPUtil is None:
+                try:
+                    import GPUtil
+                except ImportError:
+                    self.logger.warning("GPUtil模块未安装，无法读取GPU温度")
+                    self.has_gpu = False
+                    return None
+                self._GPUtil = GPUtil
+            
+            gpus = self._GPUtil.getGPUs()
             if gpus:
                 return gpus[0].temperature
             return None
@@ -184,63 +345,268 @@ class HardwareReader:
             self.logger.error(f"获取GPU温度失败: {str(e)}")
             return None
 
+    def _read_nvme_temp_ioctl(self):
+        """
+        通过 NVMe ioctl 直接读取SSD温度，避免每次启动 smartctl 进程
+        
+        :return: 温度（摄氏度），读取失败时抛出 OSError
+        """
+        if sys.platform == "win32":
+            return self._read_nvme_temp_windows()
+        
+        # Linux: 通过 Admin 命令读取 SMART/Health 日志页
+        buf = ctypes.create_string_buffer(NVME_SMART_LOG_SIZE)
+        cmd = NvmeAdminCmd()
+        cmd.opcode = NVME_ADMIN_GET_LOG_PAGE
+        cmd.nsid = 0xFFFFFFFF
+        cmd.addr = ctypes.addressof(buf)
+        cmd.data_len = NVME_SMART_LOG_SIZE
+        cmd.cdw10 = NVME_LOG_SMART | ((NVME_SMART_LOG_SIZE // 4 - 1) << 16)
+        
+        fd = os.open("/dev/nvme0", os.O_RDONLY)
+        try:
+            fcntl.ioctl(fd, NVME_IOCTL_ADMIN_CMD, cmd)
+        finally:
+            os.close(fd)
+        
+        # 字节1-2为复合温度（开尔文，小端）
+        kelvin = int.from_bytes(buf.raw[1:3], "little")
+        if kelvin == 0:
+            raise OSError("NVMe SMART日志未返回温度")
+        return float(kelvin - 273)
+
+    def _read_nvme_temp_windows(self):
+        """通过 IOCTL_STORAGE_QUERY_PROPERTY 读取SSD温度（Windows）"""
+        kernel32 = ctypes.windll.kernel32
+        kernel32.CreateFileW.restype = ctypes.c_void_p
+        handle = kernel32.CreateFileW(
+            r"\\.\PhysicalDrive0", 0,
+            0x00000001 | 0x00000002,  # FILE_SHARE_READ | FILE_SHARE_WRITE
+            None, 3, 0, None           # OPEN_EXISTING
+        )
+        if handle is None or handle == ctypes.c_void_p(-1).value:
+            raise ctypes.WinError()
+        
+        try:
+            query = StoragePropertyQuery()
+            query.PropertyId = STORAGE_DEVICE_TEMPERATURE_PROPERTY
+            query.QueryType = PROPERTY_STANDARD_QUERY
+            descriptor = StorageTemperatureDataDescriptor()
+            returned = ctypes.c_uint32()
+            
+            ok = kernel32.DeviceIoControl(
+                ctypes.c_void_p(handle), IOCTL_STORAGE_QUERY_PROPERTY,
+                ctypes.byref(query), ctypes.sizeof(query),
+                ctypes.byref(descriptor), ctypes.sizeof(descriptor),
+                ctypes.byref(returned), None
+            )
+            if not ok:
+                raise ctypes.WinError()
+            if descriptor.InfoCount == 0:
+                raise OSError("设备未返回温度信息")
+            return float(descriptor.TemperatureInfo[0].Temperature)
+        finally:
+            kernel32.CloseHandle(ctypes.c_void_p(handle))
+
     def get_ssd_temp(self) -> float:
         """获取SSD温度"""
         if not self.has_ssd:
             return None
+        
+        # 优先使用 ioctl 直接读取
+        if self._nvme_ioctl_available:
+            try:
+                return self._read_nvme_temp_ioctl()
+            except Exception as e:
+                self.logger.warning(f"NVMe ioctl读取失败，改用smartctl: {str(e)}")
+                self._nvme_ioctl_available = False
             
         try:
             # 使用smartctl获取SSD温度
             result = subprocess.run(
                 ["smartctl", "-A", "/dev/nvme0"],
                 capture_output=True,
-                text=True
+                text=True,
+                timeout=SENSOR_TIMEOUT
             )
             
             if result.returncode == 0:
                 # 解析温度数据
-                for line in result.stdout.splitlines():
-                    if "Temperature" in line:
-                        match = re.search(r"(\d+)\s+Celsius", line)
-                        if match:
-                            return float(match.group(1))
+                match = _SSD_TEMP_RE.search(result.stdout)
+                if match:
+                    return float(match.group(1))
             
             return None
         except Exception as e:
             self.logger.error(f"获取SSD温度失败: {str(e)}")
             return None
 
+    def start_polling(self, interval: float):
+        """
+        启动后台轮询线程，之后 get_all_temperatures 不再阻塞于慢速传感器
+        
+        :param interval: 轮询间隔（秒）
+        """
+        self._poll_interval = interval
+        if self._poller is not None and self._poller.is_alive():
+            return
+        self._poll_stop.clear()
+        self._poller = threading.Thread(
+            target=self._poll_forever,
+            daemon=True,
+            name="SensorPoller"
+        )
+        self._poller.start()
+        self.logger.info(f"传感器后台轮询已启动，间隔 {interval} 秒")
+
+    def set_poll_interval(self, interval: float):
+        """
+        设置后台轮询间隔
+        
+        :param interval: 轮询间隔（秒）
+        """
+        self._poll_interval = interval
+
+    def stop_polling(self, timeout: float = None):
+        """
+        停止后台轮询线程
+        
+        :param timeout: 等待线程退出的最长时间（秒），None表示不等待
+        """
+        self._poll_stop.set()
+        if self._poller is not None and timeout is not None:
+            self._poller.join(timeout)
+
+    def close(self, timeout: float = None):
+        """
+        释放硬件读取器资源：停止后台轮询、关闭线程池并关闭NVML
+        
+        :param timeout: 等待轮询线程退出的最长时间（秒），None表示不等待
+        """
+        self.stop_polling(timeout)
+        self._pool.shutdown(wait=False)
+        
+        if self._nvml is None:
+            return
+        if self._poller is not None and self._poller.is_alive():
+            # 轮询线程可能仍在读取GPU温度，此时关闭NVML不安全
+            self.logger.warning("传感器轮询线程未退出，跳过关闭NVML")
+            return
+        try:
+            self._nvml.nvmlShutdown()
+            self.logger.info("NVML已关闭")
+        except Exception as e:
+            self.logger.error(f"关闭NVML失败: {str(e)}")
+        self._nvml = None
+        self._gpu_handle = None
+
+    def _poll_forever(self):
+        """后台轮询循环：读取全部传感器并替换最近一次结果"""
+        if sys.platform == "win32":
+            # WMI的COM对象不能跨线程使用，在轮询线程中重新建立连接
+            try:
+                import pythoncom
+                pythoncom.CoInitialize()
+            except Exception as e:
+                self.logger.error(f"初始化COM失败: {str(e)}")
+            self._init_wmi()
+        
+        while not self._poll_stop.is_set():
+            # 读取结果由 _record 按设备分别写入 _latest
+            self.get_all_temperatures_into({})
+            self._poll_stop.wait(self._poll_interval)
+
     def get_all_temperatures(self) -> dict:
         """
         获取所有硬件温度
-        带有缓存机制避免频繁读取
+        后台轮询运行时直接返回最近一次读取结果，否则同步读取传感器
+        """
+        if self._poller is None:
+            return self.get_all_temperatures_into({})
+        
+        # 某个设备长时间未更新结果时（传感器卡住），只将该设备置空，不影响其他设备
+        now = time.monotonic()
+        stale_after = STALE_FACTOR * max(self._poll_interval, 1.0)
+        temps = self._latest.copy()
+        for device, read_time in self._latest_times.items():
+            if read_time is not None and now - read_time > stale_after:
+                temps[device] = None
+                if device not in self._stale_logged:
+                    self.logger.warning(f"{device}传感器读取超时，温度数据已过期")
+                    self._stale_logged.add(device)
+            else:
+                self._stale_logged.discard(device)
+        return temps
+
+    def get_all_temperatures_into(self, buf: dict) -> dict:
+        """
+        获取所有硬件温度并写入给定字典（供监控循环复用缓冲区，避免每次分配新字典）
+        
+        :param buf: 目标字典，将被原地更新
+        :return: buf 本身
         """
-        current_time = time.time()
-        if current_time - self.last_update < self.update_interval:
-            return {
-                'CPU': self.cpu_temp,
-                'GPU': self.gpu_temp,
-                'SSD': self.ssd_temp
-            }
-            
         try:
-            self.cpu_temp = self.get_cpu_temp()
-            self.gpu_temp = self.get_gpu_temp()
-            self.ssd_temp = self.get_ssd_temp()
-            self.last_update = current_time
+            # GPU和SSD读取依赖子进程，放入线程池并发执行
+            gpu_future = self._submit("GPU", self.get_gpu_temp)
+            ssd_future = self._submit("SSD", self.get_ssd_temp)
             
-            return {
-                'CPU': self.cpu_temp,
-                'GPU': self.gpu_temp,
-                'SSD': self.ssd_temp
-            }
+            try:
+                self.cpu_temp = self.get_cpu_temp()
+                self._record("CPU", self.cpu_temp)
+            except Exception as e:
+                self.logger.error(f"获取CPU温度失败: {str(e)}")
+                self.cpu_temp = None
+            self.gpu_temp = self._get_future_result(gpu_future, "GPU")
+            self.ssd_temp = self._get_future_result(ssd_future, "SSD")
         except Exception as e:
             self.logger.error(f"获取温度数据失败: {str(e)}")
-            return {
-                'CPU': None,
-                'GPU': None,
-                'SSD': None
-            }
+            buf['CPU'] = None
+            buf['GPU'] = None
+            buf['SSD'] = None
+            return buf
+        
+        buf['CPU'] = self.cpu_temp
+        buf['GPU'] = self.gpu_temp
+        buf['SSD'] = self.ssd_temp
+        return buf
+
+    def _submit(self, device: str, read):
+        """
+        提交设备的并发读取任务；上一次读取仍未完成时复用该任务，避免卡住的设备堆积任务
+        
+        :param device: 设备名称
+        :param read: 读取函数
+        :return: Future 对象
+        """
+        future = self._pending.get(device)
+        if future is not None and not future.done():
+            return future
+        future = self._pool.submit(read)
+        # 读取完成时立即记录结果，即使调用方已等待超时
+        future.add_done_callback(lambda f: self._record_future(device, f))
+        self._pending[device] = future
+        return future
+
+    def _record(self, device: str, value):
+        """记录设备最近一次读取完成的结果和时间"""
+        self._latest[device] = value
+        self._latest_times[device] = time.monotonic()
+
+    def _record_future(self, device: str, future):
+        """并发读取完成回调：读取成功时记录结果"""
+        if not future.cancelled() and future.exception() is None:
+            self._record(device, future.result())
+
+    def _get_future_result(self, future, device: str):
+        """获取并发读取结果，单个设备失败或超时不影响其他设备"""
+        try:
+            return future.result(timeout=SENSOR_TIMEOUT)
+        except FutureTimeoutError:
+            self.logger.warning(f"获取{device}温度超时")
+            return None
+        except Exception as e:
+            self.logger.error(f"获取{device}温度失败: {str(e)}")
+            return None
 
     def get_hardware_names(self) -> dict:
         """获取硬件名称"""
@@ -4,12 +4,54 @@
 负责定时采集硬件温度数据、检查告警阈值、记录日志和协调UI更新
 """
 
+import math
 import time
 import threading
 import logging
-from datetime import datetime
 from typing import Dict, Optional, Callable
 
+# 相邻两次采样间允许的最大温度变化（°C）
+MAX_TEMP_DELTA = 20.0
+
+# 传感器数量达到该值时才使用JIT内核（传感器很少时数组转换开销反而更大）
+JIT_SENSOR_THRESHOLD = 16
+
+
+def _find_temp_spike(cur, last, max_delta):
+    """
+    查找温度异常波动的传感器
+    
+    :param cur: 当前温度数组（NaN表示无数据）
+    :param last: 上次温度数组（NaN表示无数据）
+    :param max_delta: 允许的最大变化量
+    :return: 第一个异常传感器的下标，没有则返回-1
+    """
+    for i in range(cur.size):
+        if not math.isnan(cur[i]) and not math.isnan(last[i]) and abs(cur[i] - last[i]) > max_delta:
+            return i
+    return -1
+
+
+# 可选的 numba 加速（传感器数量较多时使用）：首次需要时才导入并编译
+# _jit_kernel 为 None 表示尚未尝试，False 表示不可用
+_np = None
+_jit_kernel = None
+
+
+def _get_jit_kernel():
+    """获取JIT编译的 _find_temp_spike（numba 不可用时返回None）"""
+    global _np, _jit_kernel
+    if _jit_kernel is None:
+        try:
+            import numpy
+            from numba import njit
+            _np = numpy
+            _jit_kernel = njit(cache=True)(_find_temp_spike)
+        except ImportError:
+            _jit_kernel = False
+    return _jit_kernel or None
+
+
 class HardwareMonitor:
     def __init__(self, config_manager, hardware_reader, alert_system):
         """
@@ -28,17 +70,20 @@ class HardwareMonitor:
         self.is_running = False
         self.last_temperatures = {}
         self.current_temperatures = {}
-        self.last_alert_time = {}
         
         # 回调函数
         self.ui_update_callback = None
         self.alert_callback = None
         self.log_callback = None
         
-        # 监控线程
+        # 监控线程（停止事件可立即唤醒休眠中的循环）
         self.monitor_thread = None
+        self._stop_event = threading.Event()
         self.update_interval = self.config.get_update_interval()
         
+        # 缓存的配置项（配置变更时通过 refresh_config 刷新）
+        self._log_enabled = self.config.get_log_temperatures()
+        
         self.logger.info("硬件监控器初始化完成")
 
     def start_monitoring(self):
@@ -48,6 +93,7 @@ class HardwareMonitor:
             return
         
         self.is_running = True
+        self._stop_event.clear()
         self.monitor_thread = threading.Thread(
             target=self._monitor_loop,
             daemon=True,
@@ -63,6 +109,7 @@ class HardwareMonitor:
             return
         
         self.is_running = False
+        self._stop_event.set()
         if self.monitor_thread and self.monitor_thread.is_alive():
             self.monitor_thread.join(timeout=5)
         self.logger.info("硬件监控已停止")
@@ -71,60 +118,85 @@ class HardwareMonitor:
         """监控主循环"""
         self.logger.info("监控循环开始运行")
         
-        # 初始化上次温度记录
+        # 初始化上次温度记录（两个缓冲字典每轮交换，避免逐轮复制）
         self.last_temperatures = self.hardware_reader.get_all_temperatures()
+        self.current_temperatures = {}
         
-        while self.is_running:
+        while not self._stop_event.is_set():
             try:
-                start_time = time.time()
+                # 间隔计时使用单调时钟，不受系统时间校正影响
+                start_time = time.monotonic()
                 
-                # 获取当前温度
-                self.current_temperatures = self.hardware_reader.get_all_temperatures()
+                # 获取当前温度（原地填充当前缓冲区）
+                self.hardware_reader.get_all_temperatures_into(self.current_temperatures)
                 
                 # 检查数据有效性
                 if not self._validate_temperatures():
-                    time.sleep(self.update_interval)
+                    if self._stop_event.wait(self.update_interval):
+                        break
                     continue
                 
+                # 外部回调可能保留传入的字典，交给它们本轮数据的快照，
+                # 内部缓冲区只用于校验和告警检查
+                snapshot = dict(self.current_temperatures)
+                
                 # 更新UI
-                self._update_ui()
+                self._update_ui(snapshot)
                 
-                # 检查告警
-                self._check_alerts()
+                # 检查告警（告警记录需要墙上时间）
+                self._check_alerts(time.time())
                 
                 # 记录温度数据
-                self._log_temperatures()
+                self._log_temperatures(snapshot)
                 
-                # 更新上次温度记录
-                self.last_temperatures = self.current_temperatures.copy()
+                # 更新上次温度记录（交换缓冲区，下一轮覆盖旧数据）
+                self.last_temperatures, self.current_temperatures = (
+                    self.current_temperatures, self.last_temperatures
+                )
                 
                 # 计算实际休眠时间（考虑操作耗时）
-                elapsed = time.time() - start_time
+                elapsed = time.monotonic() - start_time
                 sleep_time = max(0.5, self.update_interval - elapsed)
-                time.sleep(sleep_time)
+                if self._stop_event.wait(sleep_time):
+                    break
                 
             except Exception as e:
                 self.logger.error(f"监控循环异常: {str(e)}", exc_info=True)
-                time.sleep(5)  # 出错后短暂休眠
+                if self._stop_event.wait(5):  # 出错后短暂休眠
+                    break
         
         self.logger.info("监控循环退出")
 
     def _validate_temperatures(self) -> bool:
         """验证温度数据有效性"""
+        cur = self.current_temperatures
+        last = self.last_temperatures
+        
         # 检查是否有有效数据
-        if not any(temp is not None for temp in self.current_temperatures.values()):
+        has_valid = False
+        for temp in cur.values():
+            if temp is not None:
+                has_valid = True
+                break
+        if not has_valid:
             self.logger.warning("未获取到有效温度数据")
             return False
         
         # 检查数据异常波动（可选功能）
-        for device, temp in self.current_temperatures.items():
-            last_temp = self.last_temperatures.get(device)
-            
-            if temp is None or last_temp is None:
+        if len(cur) >= JIT_SENSOR_THRESHOLD:
+            kernel = _get_jit_kernel()
+            if kernel is not None:
+                return self._validate_spikes_jit(kernel, cur, last)
+        
+        for device, temp in cur.items():
+            if temp is None:
+                continue
+            last_temp = last.get(device)
+            if last_temp is None:
                 continue
                 
             # 温度在1秒内变化超过20°C视为异常
-            if abs(temp - last_temp) > 20:
+            if abs(temp - last_temp) > MAX_TEMP_DELTA:
                 self.logger.warning(
                     f"{device}温度异常波动: {last_temp}°C → {temp}°C"
                 )
@@ -132,32 +204,50 @@ class HardwareMonitor:
         
         return True
 
-    def _update_ui(self):
-        """触发UI更新回调"""
+    def _validate_spikes_jit(self, kernel, cur: Dict[str, Optional[float]], last: Dict[str, Optional[float]]) -> bool:
+        """
+        使用JIT内核检查大量传感器的温度波动
+        
+        :param kernel: JIT编译的 _find_temp_spike
+        """
+        devices = list(cur)
+        nan = math.nan
+        cur_arr = _np.array([nan if cur[d] is None else cur[d] for d in devices], dtype=_np.float64)
+        last_arr = _np.array(
+            [nan if last.get(d) is None else last[d] for d in devices], dtype=_np.float64
+        )
+        
+        # 首次调用时编译（cache=True 时之后的启动直接读取磁盘缓存）
+        idx = kernel(cur_arr, last_arr, MAX_TEMP_DELTA)
+        if idx >= 0:
+            device = devices[idx]
+            self.logger.warning(
+                f"{device}温度异常波动: {last[device]}°C → {cur[device]}°C"
+            )
+            return False
+        return True
+
+    def _update_ui(self, temps: Dict[str, Optional[float]]):
+        """
+        触发UI更新回调
+        
+        :param temps: 本轮温度数据快照
+        """
         if callable(self.ui_update_callback):
             try:
-                self.ui_update_callback(self.current_temperatures)
+                self.ui_update_callback(temps)
             except Exception as e:
                 self.logger.error(f"UI更新回调失败: {str(e)}")
 
-    def _check_alerts(self):
-        """检查并处理告警"""
-        alerts = self.alert_system.check_thresholds(self.current_temperatures)
+    def _check_alerts(self, now: float):
+        """
+        检查并处理告警（冷却由 AlertSystem 统一处理）
         
-        for alert in alerts:
-            device = alert.split()[0]  # 提取设备名
-            
-            # 避免重复告警
-            last_alert = self.last_alert_time.get(device, 0)
-            cooldown = self.config.get_alert_cooldown()
-            
-            if time.time() - last_alert < cooldown:
-                self.logger.debug(f"跳过重复告警: {alert}")
-                continue
-                
-            # 记录告警时间
-            self.last_alert_time[device] = time.time()
-            
+        :param now: 本轮采样的Unix时间戳
+        """
+        alerts = self.alert_system.check_thresholds(self.current_temperatures, now)
+        
+        for device, alert in alerts:
             # 触发告警回调
             if callable(self.alert_callback):
                 try:
@@ -167,20 +257,34 @@ class HardwareMonitor:
             
             self.logger.warning(alert)
 
-    def _log_temperatures(self):
-        """记录温度数据"""
-        if not self.config.get_log_temperatures():
+    def _log_temperatures(self, temps: Dict[str, Optional[float]]):
+        """
+        记录温度数据
+        
+        :param temps: 本轮温度数据快照
+        """
+        if not self._log_enabled:
             return
             
         if callable(self.log_callback):
             try:
-                self.log_callback(self.current_temperatures)
+                self.log_callback(temps)
             except Exception as e:
                 self.logger.error(f"日志记录回调失败: {str(e)}")
 
+    def refresh_config(self):
+        """刷新缓存的配置项（配置改变时调用）"""
+        self._log_enabled = self.config.get_log_temperatures()
+        self.logger.info("监控器配置已刷新")
+
     def get_current_temperatures(self) -> Dict[str, Optional[float]]:
-        """获取当前温度数据"""
-        return self.current_temperatures.copy()
+        """
+        获取当前温度数据
+        
+        每轮结束后缓冲区交换，最近一次完成的采样位于 last_temperatures；
+        返回其快照，因为内部缓冲区会被监控循环复用
+        """
+        return self.last_temperatures.copy()
 
     def set_ui_update_callback(self, callback: Callable[[Dict[str, float]], None]):
         """设置UI更新回调函数"""
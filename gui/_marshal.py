@@ -0,0 +1,53 @@
+# gui/_marshal.py
+"""
+跨线程界面调用封装
+Tkinter 不是线程安全的，后台线程必须通过事件循环执行界面操作
+"""
+
+import queue
+import logging
+
+# 投递事件名称：后台线程生成该虚拟事件，由 UI 线程中绑定的处理函数执行队列中的调用
+MARSHAL_EVENT = "<<Marshal>>"
+
+logger = logging.getLogger("Marshal")
+
+# 已安装处理函数的根窗口，以及待执行的调用队列
+_installed_root = None
+_calls = queue.SimpleQueue()
+
+def install(root):
+    """
+    在 UI 线程中为根窗口绑定投递事件的处理函数（根窗口重建后需重新调用）
+    
+    :param root: Tk 根窗口
+    """
+    global _installed_root
+    root.bind(MARSHAL_EVENT, _drain)
+    _installed_root = root
+
+def _drain(event=None):
+    """在 UI 线程中依次执行所有已投递的调用"""
+    while True:
+        try:
+            fn, args, kwargs = _calls.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            logger.error("执行投递的界面调用失败: %s", e, exc_info=True)
+
+def post(root, fn, *args, **kwargs):
+    """
+    将函数调用投递到 Tk 事件循环中执行
+    
+    :param root: Tk 根窗口
+    :param fn: 要执行的函数
+    """
+    if root is not _installed_root:
+        # 未安装事件处理函数的窗口，退回到空闲回调
+        root.after_idle(lambda: fn(*args, **kwargs))
+        return
+    _calls.put((fn, args, kwargs))
+    root.event_generate(MARSHAL_EVENT, when="tail")
@@ -10,6 +10,7 @@ import logging
 import threading
 import time
 from utils.helpers import clamp
+from gui._marshal import post
 
 class AlertWindow:
     def __init__(self, app):
@@ -20,8 +21,17 @@ class AlertWindow:
         """
         self.logger = logging.getLogger("AlertWindow")
         self.app = app
+        # 告警窗口及其控件在首次告警时创建，之后复用
         self.window = None
+        self.icon_label = None
+        self.msg_label = None
+        self.ok_btn = None
+        # 当前显示的告警消息及自动关闭任务
+        self._message = None
+        self._close_after = None
         self.active_alerts = set()
+        # show_alert 可能由后台线程调用，保护 active_alerts
+        self._lock = threading.Lock()
         
         self.logger.info("告警窗口初始化完成")
 
@@ -32,98 +42,110 @@ class AlertWindow:
         :param message: 告警消息
         :param duration: 显示时间（秒），0表示一直显示
         """
-        if message in self.active_alerts:
-            return
-            
-        self.active_alerts.add(message)
+        with self._lock:
+            if message in self.active_alerts:
+                return
+            self.active_alerts.add(message)
+        
+        # Tkinter非线程安全，切换到主窗口的事件循环中显示告警窗口
+        post(self.app.floating_win.window, self._display_alert, message, duration)
+
+    def _build_window(self):
+        """创建告警窗口（仅创建一次，初始隐藏，之后每次告警复用）"""
+        window = tk.Toplevel()
+        window.withdraw()
+        window.title("温度警告!")
+        window.attributes('-topmost', True)
+        window.resizable(False, False)
+        window.configure(bg='#e74c3c')  # 红色背景
+        window.protocol("WM_DELETE_WINDOW", self._close_alert)
+        
+        # 设置位置（屏幕中央）
+        screen_width = window.winfo_screenwidth()
+        screen_height = window.winfo_screenheight()
+        window_width = 400
+        window_height = 150
+        x = (screen_width - window_width) // 2
+        y = (screen_height - window_height) // 2
+        window.geometry(f"{window_width}x{window_height}+{x}+{y}")
+        
+        # 告警图标
+        self.icon_label = ttk.Label(
+            window, 
+            text="⚠️", 
+            font=("Arial", 24),
+            background='#e74c3c',
+            foreground='white'
+        )
+        self.icon_label.pack(pady=(10, 0))
+        
+        # 告警消息
+        self.msg_label = ttk.Label(
+            window, 
+            text="", 
+            font=("Arial", 12, "bold"),
+            wraplength=380,
+            justify='center',
+            background='#e74c3c',
+            foreground='white'
+        )
+        self.msg_label.pack(pady=10, padx=20, fill='both')
         
-        # 在单独线程中显示窗口
-        threading.Thread(
-            target=self._show_alert_thread, 
-            args=(message, duration),
-            daemon=True
-        ).start()
+        # 确认按钮
+        btn_frame = ttk.Frame(window)
+        btn_frame.pack(pady=10)
+        
+        self.ok_btn = ttk.Button(
+            btn_frame, 
+            text="知道了", 
+            command=self._close_alert,
+            style='Alert.TButton'
+        )
+        self.ok_btn.pack(pady=5)
+        
+        self.window = window
 
-    def _show_alert_thread(self, message: str, duration: int):
-        """在单独线程中显示告警窗口"""
+    def _display_alert(self, message: str, duration: int):
+        """在UI线程中显示告警（更新已有窗口的文本并显示）"""
         try:
-            # 创建窗口
-            self.window = tk.Toplevel()
-            self.window.title("温度警告!")
-            self.window.attributes('-topmost', True)
-            self.window.resizable(False, False)
-            self.window.configure(bg='#e74c3c')  # 红色背景
-            
-            # 设置位置（屏幕中央）
-            screen_width = self.window.winfo_screenwidth()
-            screen_height = self.window.winfo_screenheight()
-            window_width = 400
-            window_height = 150
-            x = (screen_width - window_width) // 2
-            y = (screen_height - window_height) // 2
-            self.window.geometry(f"{window_width}x{window_height}+{x}+{y}")
+            if self.window is None or not self.window.winfo_exists():
+                self._build_window()
             
-            # 告警图标
-            icon_label = ttk.Label(
-                self.window, 
-                text="⚠️", 
-                font=("Arial", 24),
-                background='#e74c3c',
-                foreground='white'
-            )
-            icon_label.pack(pady=(10, 0))
+            # 新告警替换窗口中仍在显示的旧告警
+            self._cancel_auto_close()
+            if self._message is not None and self._message != message:
+                with self._lock:
+                    self.active_alerts.discard(self._message)
+            self._message = message
             
-            # 告警消息
-            msg_label = ttk.Label(
-                self.window, 
-                text=message, 
-                font=("Arial", 12, "bold"),
-                wraplength=380,
-                justify='center',
-                background='#e74c3c',
-                foreground='white'
-            )
-            msg_label.pack(pady=10, padx=20, fill='both')
-            
-            # 确认按钮
-            btn_frame = ttk.Frame(self.window)
-            btn_frame.pack(pady=10)
-            
-            ok_btn = ttk.Button(
-                btn_frame, 
-                text="知道了", 
-                command=self._close_alert,
-                style='Alert.TButton'
-            )
-            ok_btn.pack(pady=5)
-            
-            # 应用样式
-            self._configure_styles()
+            self.msg_label.configure(text=message)
+            self.window.deiconify()
+            self.window.lift()
             
             # 如果设置了持续时间，自动关闭
             if duration > 0:
-                self.window.after(duration * 1000, self._close_alert)
+                self._close_after = self.window.after(duration * 1000, self._close_alert)
             
             self.logger.info(f"显示告警: {message}")
-            self.window.mainloop()
             
         except Exception as e:
             self.logger.error(f"显示告警窗口失败: {str(e)}")
-        finally:
-            self.active_alerts.discard(message)
+            with self._lock:
+                self.active_alerts.discard(message)
 
-    def _configure_styles(self):
-        """配置窗口样式"""
-        style = ttk.Style()
-        style.configure(
-            'Alert.TButton', 
-            background='#c0392b', 
-            foreground='white',
-            font=("Arial", 10, "bold")
-        )
+    def _cancel_auto_close(self):
+        """取消尚未执行的自动关闭"""
+        if self._close_after is not None:
+            self.window.after_cancel(self._close_after)
+            self._close_after = None
 
     def _close_alert(self):
-        """关闭当前告警窗口"""
-        if self.window and self.window.winfo_exists():
-            self.window.destroy()
-        self.logger.info("告警窗口已关闭")
\ No newline at end of file
+        """关闭告警窗口（隐藏而不销毁，下次告警时复用）"""
+        if self.window is not None and self.window.winfo_exists():
+            self._cancel_auto_close()
+            self.window.withdraw()
+        if self._message is not None:
+            with self._lock:
+                self.active_alerts.discard(self._message)
+            self._message = None
+        self.logger.info("告警窗口已关闭")
@@ -7,7 +7,16 @@
 import tkinter as tk
 from tkinter import ttk
 import logging
+import time
 from utils.helpers import clamp
+from gui import styles, _marshal
+
+# 温度条尺寸与颜色
+BAR_WIDTH = 200
+BAR_HEIGHT = 10
+BAR_TROUGH_COLOR = '#34495e'
+BAR_NORMAL_COLOR = '#3498db'
+BAR_ALERT_COLOR = '#e74c3c'
 
 class FloatingWindow:
     def __init__(self, app, on_close=None):
@@ -26,13 +35,46 @@ class FloatingWindow:
         self.is_dragging = False
         self.drag_start_x = 0
         self.drag_start_y = 0
+        # 拖动起点（窗口位置与鼠标屏幕坐标），拖动中不再查询窗口位置
+        self._win_x0 = 0
+        self._win_y0 = 0
+        self._root_x0 = 0
+        self._root_y0 = 0
+        # 上次设置的窗口位置（位置未变化时不再调用geometry）
+        self._last_xy = (None, None)
+        # 窗口是否存活（由<Destroy>事件维护，避免每次更新都调用winfo_exists）
+        self._alive = False
+        
+        # 上次渲染的内容（未变化时跳过控件重绘）
+        self._last = {}
+        self._last_title = None
+        
+        # 刷新频率限制：过快到达的数据合并到下一帧绘制
+        self._min_interval = 1.0
+        self._last_draw = 0.0
+        self._pending = None
+        self._flush_scheduled = False
+        
+        # 滚轮调整透明度：合并短时间内的多次滚动，统一应用一次
+        self._pending_delta = 0.0
+        self._opacity_after = None
+        
+        # 缓存的温度阈值（配置变更时通过 on_config_changed 刷新）
+        self._thresholds = {}
+        self._load_config()
         
         self._create_window()
         self.logger.info("悬浮窗初始化完成")
 
     def _create_window(self):
         """创建悬浮窗口"""
+        self._last = {}
+        self._last_title = None
         self.window = tk.Tk()
+        self._alive = True
+        styles.configure_once(self.window)
+        # 后台线程通过虚拟事件把界面调用投递到本窗口的事件循环
+        _marshal.install(self.window)
         self.window.title("硬件温度监控")
         self.window.overrideredirect(True)  # 无边框
         self.window.attributes('-topmost', True)  # 置顶
@@ -76,16 +118,19 @@ class FloatingWindow:
             temp_label.pack(side='right')
             self.labels[device] = temp_label
             
-            # 温度条
-            bar = ttk.Progressbar(
-                self.window, orient='horizontal', 
-                length=200, mode='determinate'
+            # 温度条（Canvas矩形，更新时只需修改坐标和颜色）
+            canvas = tk.Canvas(
+                self.window, width=BAR_WIDTH, height=BAR_HEIGHT,
+                bg=BAR_TROUGH_COLOR, highlightthickness=0
+            )
+            canvas.pack(padx=10, pady=(0, 10))
+            rect = canvas.create_rectangle(
+                0, 0, 0, BAR_HEIGHT, fill=BAR_NORMAL_COLOR, outline=''
             )
-            bar.pack(fill='x', padx=10, pady=(0, 10))
-            self.temp_bars[device] = bar
+            self.temp_bars[device] = (canvas, rect)
         
-        # 样式配置
-        self._configure_styles()
+        # 窗口销毁时更新存活标志
+        self.window.bind("<Destroy>", self._on_destroy)
         
         # 绑定拖动事件
         self.window.bind("<ButtonPress-1>", self.start_drag)
@@ -101,92 +146,157 @@ class FloatingWindow:
         
         self.window.protocol("WM_DELETE_WINDOW", self.close)
 
-    def _configure_styles(self):
-        """配置窗口样式"""
-        style = ttk.Style()
-        
-        # 关闭按钮样式
-        style.configure(
-            'Close.TButton', 
-            background='#e74c3c', 
-            foreground='white',
-            font=("Arial", 8, "bold")
-        )
-        
-        # 设置按钮样式
-        style.configure(
-            'Settings.TButton', 
-            background='#3498db', 
-            foreground='white',
-            font=("Arial", 8)
-        )
-        
-        # 温度条样式
-        style.configure(
-            "Horizontal.TProgressbar",
-            background='#3498db',
-            troughcolor='#34495e',
-            thickness=10
-        )
+    def _load_config(self):
+        """从配置中读取绘制时需要的阈值和刷新频率"""
+        config = self.app.config
+        self._thresholds = {d: config.get_threshold(d) for d in ('CPU', 'GPU', 'SSD')}
+        self._min_interval = 1.0 / max(config.get_max_redraw_rate(), 0.1)
+
+    def on_config_changed(self):
+        """配置保存后调用：刷新缓存的配置，并在下次更新时重绘全部控件"""
+        self._load_config()
+        self._last = {}
+
+    @property
+    def alive(self) -> bool:
+        """窗口是否存在（不调用Tk，可在任意线程中读取）"""
+        return self._alive
+
+    def _on_destroy(self, event):
+        """窗口销毁回调（子控件销毁也会触发，只处理根窗口）"""
+        if event.widget is self.window:
+            self._alive = False
 
     def start_drag(self, event):
         """开始拖动窗口"""
         self.is_dragging = True
         self.drag_start_x = event.x
         self.drag_start_y = event.y
+        self._win_x0 = self.window.winfo_x()
+        self._win_y0 = self.window.winfo_y()
+        self._root_x0 = event.x_root
+        self._root_y0 = event.y_root
+        self._last_xy = (None, None)
 
     def drag_window(self, event):
         """拖动窗口"""
         if self.is_dragging:
-            x = self.window.winfo_x() + (event.x - self.drag_start_x)
-            y = self.window.winfo_y() + (event.y - self.drag_start_y)
-            self.window.geometry(f"+{x}+{y}")
+            x = self._win_x0 + event.x_root - self._root_x0
+            y = self._win_y0 + event.y_root - self._root_y0
+            if (x, y) == self._last_xy:
+                return
+            self._last_xy = (x, y)
+            self.window.wm_geometry(f"+{x}+{y}")
 
     def stop_drag(self, event):
         """停止拖动"""
         self.is_dragging = False
 
     def adjust_opacity(self, event):
-        """使用鼠标滚轮调整窗口透明度"""
+        """使用鼠标滚轮调整窗口透明度（累积滚动量，每50毫秒最多应用一次）"""
+        self._pending_delta += 0.05 if event.delta > 0 else -0.05
+        if self._opacity_after is None:
+            self._opacity_after = self.window.after(50, self._apply_opacity)
+
+    def _apply_opacity(self):
+        """应用累积的透明度变化"""
+        self._opacity_after = None
+        delta, self._pending_delta = self._pending_delta, 0.0
+        if not self._alive or not delta:
+            return
         current_opacity = self.window.attributes('-alpha')
-        delta = 0.05 if event.delta > 0 else -0.05
         new_opacity = clamp(current_opacity + delta, 0.3, 1.0)
         self.window.attributes('-alpha', new_opacity)
         self.logger.info(f"窗口透明度调整为: {new_opacity:.2f}")
 
     def update_temps(self, temps: dict):
         """
-        更新温度显示
+        更新温度显示（必须在UI线程中调用，后台线程请通过 gui._marshal.post 投递）
         
         :param temps: 温度字典 {'CPU': 45.0, 'GPU': 60.0, 'SSD': 35.0}
         """
-        if not self.window.winfo_exists():
+        if not self._alive:
             return
-            
+        
+        # 距上次绘制过近时暂存数据，合并到下一帧
+        if time.monotonic() - self._last_draw < self._min_interval:
+            self._pending = temps
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                self.window.after(int(self._min_interval * 1000), self._flush_pending)
+            return
+        
+        self._draw_temps(temps)
+
+    def _flush_pending(self):
+        """绘制被限流暂存的最新温度数据"""
+        self._flush_scheduled = False
+        temps, self._pending = self._pending, None
+        if temps is not None and self._alive:
+            self._draw_temps(temps)
+
+    def _draw_temps(self, temps: dict):
+        """将温度数据绘制到控件上（先收集变更，再统一提交并刷新一次）"""
+        self._last_draw = time.monotonic()
         try:
+            label_updates = []   # (控件, 配置参数)
+            bar_updates = []     # (画布, 矩形, 宽度, 颜色)
+            
             for device, temp in temps.items():
-                if device in self.labels:
-                    # 更新温度文本
-                    self.labels[device].config(text=f"{temp}°C" if temp is not None else "--°C")
-                    
-                    # 更新温度条
-                    bar = self.temp_bars[device]
-                    threshold = self.app.config.get_threshold(device)
-                    
-                    # 设置温度条值（0-100范围）
-                    if temp is not None:
-                        value = min(temp, threshold * 1.2)  # 上限为阈值的1.2倍
-                        bar['value'] = (value / (threshold * 1.2)) * 100
-                        
-                        # 根据温度设置颜色
-                        if temp > threshold:
-                            bar.configure(style='Alert.Horizontal.TProgressbar')
-                        else:
-                            bar.configure(style='Normal.Horizontal.TProgressbar')
+                if device not in self.labels:
+                    continue
+                
+                # 计算温度文本、温度条宽度和颜色
+                text = f"{temp}°C" if temp is not None else "--°C"
+                width = None
+                color = None
+                if temp is not None:
+                    threshold = self._thresholds[device]
+                    limit = threshold * 1.2  # 上限为阈值的1.2倍
+                    width = int(BAR_WIDTH * min(temp, limit) / limit)
+                    # 根据温度设置颜色
+                    color = BAR_ALERT_COLOR if temp > threshold else BAR_NORMAL_COLOR
+                
+                last_text, last_width, last_color = self._last.get(device, (None, None, None))
+                
+                # 仅收集发生变化的内容
+                if text != last_text:
+                    label_updates.append((self.labels[device], {'text': text}))
+                
+                new_width = width if width is not None and width != last_width else None
+                new_color = color if color is not None and color != last_color else None
+                if new_width is not None or new_color is not None:
+                    canvas, rect = self.temp_bars[device]
+                    bar_updates.append((canvas, rect, new_width, new_color))
+                
+                self._last[device] = (
+                    text,
+                    last_width if width is None else width,
+                    last_color if color is None else color
+                )
             
-            # 更新窗口标题
+            # 窗口标题
             cpu_temp = temps.get('CPU', '--')
-            self.window.title(f"CPU: {cpu_temp}°C")
+            title = f"CPU: {cpu_temp}°C"
+            new_title = title if title != self._last_title else None
+            
+            if not label_updates and not bar_updates and new_title is None:
+                return
+            
+            # 统一提交变更：每个控件只配置一次
+            for widget, options in label_updates:
+                widget.configure(**options)
+            for canvas, rect, width, color in bar_updates:
+                if width is not None:
+                    canvas.coords(rect, 0, 0, width, BAR_HEIGHT)
+                if color is not None:
+                    canvas.itemconfig(rect, fill=color)
+            if new_title is not None:
+                self.window.title(new_title)
+                self._last_title = new_title
+            
+            # 所有变更完成后统一处理一次重绘
+            self.window.update_idletasks()
             
         except Exception as e:
             self.logger.error(f"更新温度显示失败: {str(e)}")
@@ -5,7 +5,7 @@
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk
 import logging
 from utils.helpers import clamp
 
@@ -20,9 +20,10 @@ class SettingsWindow:
         self.logger = logging.getLogger("SettingsWindow")
         self.app = app
         self.on_save = on_save or (lambda: None)
+        # 控件在首次 show() 时才创建，关闭后隐藏以便复用
         self.window = None
-        
-        self._create_window()
+        self.status_label = None
+        self._close_after = None
         self.logger.info("设置窗口初始化完成")
 
     def _create_window(self):
@@ -72,10 +73,12 @@ class SettingsWindow:
         )
         cancel_btn.pack(side='right', padx=5)
         
-        # 应用样式
-        self._configure_styles()
+        # 状态提示（代替阻塞的消息框）
+        self.status_label = ttk.Label(btn_frame, text='')
+        self.status_label.pack(side='left')
         
         self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self._refresh_values()
 
     def _create_thresholds_tab(self, parent):
         """创建阈值设置标签页"""
@@ -84,44 +87,36 @@ class SettingsWindow:
         cpu_frame.pack(fill='x', pady=5)
         ttk.Label(cpu_frame, text="CPU阈值 (°C):").pack(side='left')
         self.cpu_threshold = ttk.Spinbox(
-            cpu_frame, from_=50, to=100, width=5,
-            validate="key", validatecommand=(parent.register(self._validate_temp), '%P')
+            cpu_frame, from_=50, to=100, width=5
         )
         self.cpu_threshold.pack(side='right')
-        self.cpu_threshold.set(self.app.config.get_threshold('CPU'))
         
         # GPU阈值
         gpu_frame = ttk.Frame(parent)
         gpu_frame.pack(fill='x', pady=5)
         ttk.Label(gpu_frame, text="GPU阈值 (°C):").pack(side='left')
         self.gpu_threshold = ttk.Spinbox(
-            gpu_frame, from_=60, to=110, width=5,
-            validate="key", validatecommand=(parent.register(self._validate_temp), '%P')
+            gpu_frame, from_=60, to=110, width=5
         )
         self.gpu_threshold.pack(side='right')
-        self.gpu_threshold.set(self.app.config.get_threshold('GPU'))
         
         # SSD阈值
         ssd_frame = ttk.Frame(parent)
         ssd_frame.pack(fill='x', pady=5)
         ttk.Label(ssd_frame, text="SSD阈值 (°C):").pack(side='left')
         self.ssd_threshold = ttk.Spinbox(
-            ssd_frame, from_=40, to=80, width=5,
-            validate="key", validatecommand=(parent.register(self._validate_temp), '%P')
+            ssd_frame, from_=40, to=80, width=5
         )
         self.ssd_threshold.pack(side='right')
-        self.ssd_threshold.set(self.app.config.get_threshold('SSD'))
         
         # 告警冷却时间
         cooldown_frame = ttk.Frame(parent)
         cooldown_frame.pack(fill='x', pady=5)
         ttk.Label(cooldown_frame, text="告警冷却时间 (分钟):").pack(side='left')
         self.alert_cooldown = ttk.Spinbox(
-            cooldown_frame, from_=1, to=60, width=5,
-            validate="key", validatecommand=(parent.register(self._validate_int), '%P')
+            cooldown_frame, from_=1, to=60, width=5
         )
         self.alert_cooldown.pack(side='right')
-        self.alert_cooldown.set(self.app.config.get_alert_cooldown() // 60)
 
     def _create_general_tab(self, parent):
         """创建常规设置标签页"""
@@ -130,16 +125,14 @@ class SettingsWindow:
         interval_frame.pack(fill='x', pady=5)
         ttk.Label(interval_frame, text="更新间隔 (秒):").pack(side='left')
         self.update_interval = ttk.Spinbox(
-            interval_frame, from_=1, to=60, width=5,
-            validate="key", validatecommand=(parent.register(self._validate_int), '%P')
+            interval_frame, from_=1, to=60, width=5
         )
         self.update_interval.pack(side='right')
-        self.update_interval.set(self.app.config.get_update_interval())
         
         # 启动选项
         startup_frame = ttk.Frame(parent)
         startup_frame.pack(fill='x', pady=5)
-        self.start_minimized = tk.BooleanVar(value=self.app.config.get_start_minimized())
+        self.start_minimized = tk.BooleanVar()
         ttk.Checkbutton(
             startup_frame, text="启动时最小化到托盘",
             variable=self.start_minimized
@@ -148,7 +141,7 @@ class SettingsWindow:
         # 日志选项
         logging_frame = ttk.Frame(parent)
         logging_frame.pack(fill='x', pady=5)
-        self.log_temps = tk.BooleanVar(value=self.app.config.get_log_temperatures())
+        self.log_temps = tk.BooleanVar()
         ttk.Checkbutton(
             logging_frame, text="记录温度日志",
             variable=self.log_temps
@@ -157,7 +150,7 @@ class SettingsWindow:
         # 声音提示
         sound_frame = ttk.Frame(parent)
         sound_frame.pack(fill='x', pady=5)
-        self.enable_sound = tk.BooleanVar(value=self.app.notifier.sound_enabled)
+        self.enable_sound = tk.BooleanVar()
         ttk.Checkbutton(
             sound_frame, text="启用声音提示",
             variable=self.enable_sound
@@ -176,18 +169,15 @@ class SettingsWindow:
             width=10
         )
         self.theme.pack(side='right')
-        self.theme.set(self.app.config.get_theme().capitalize())
         
         # 字体大小
         font_frame = ttk.Frame(parent)
         font_frame.pack(fill='x', pady=5)
         ttk.Label(font_frame, text="字体大小:").pack(side='left')
         self.font_size = ttk.Spinbox(
-            font_frame, from_=8, to=20, width=5,
-            validate="key", validatecommand=(parent.register(self._validate_int), '%P')
+            font_frame, from_=8, to=20, width=5
         )
         self.font_size.pack(side='right')
-        self.font_size.set(self.app.config.get_font_size())
         
         # 窗口透明度
         opacity_frame = ttk.Frame(parent)
@@ -198,53 +188,79 @@ class SettingsWindow:
             showvalue=False, length=150
         )
         self.opacity.pack(side='right')
-        self.opacity.set(int(self.app.config.get_opacity() * 100))
 
-    def _configure_styles(self):
-        """配置窗口样式"""
-        style = ttk.Style()
-        style.configure('Accent.TButton', background='#3498db', foreground='white')
+    def _set_status(self, text: str, color: str = ''):
+        """
+        在窗口底部显示状态提示
+        
+        :param text: 提示文本
+        :param color: 文本颜色（为空时使用默认颜色）
+        """
+        self.status_label.configure(text=text, foreground=color)
 
-    def _validate_temp(self, value: str) -> bool:
-        """验证温度值输入"""
-        if value == "":
-            return True
-        try:
-            temp = float(value)
-            return 0 <= temp <= 150
-        except ValueError:
-            return False
+    def _refresh_values(self):
+        """从当前配置重新填充各控件的值"""
+        self._set_status('')
+        config = self.app.config
+        self.cpu_threshold.set(config.get_threshold('CPU'))
+        self.gpu_threshold.set(config.get_threshold('GPU'))
+        self.ssd_threshold.set(config.get_threshold('SSD'))
+        self.alert_cooldown.set(config.get_alert_cooldown() // 60)
+        self.update_interval.set(config.get_update_interval())
+        self.start_minimized.set(config.get_start_minimized())
+        self.log_temps.set(config.get_log_temperatures())
+        self.enable_sound.set(self.app.notifier.sound_enabled)
+        self.theme.set(config.get_theme().capitalize())
+        self.font_size.set(config.get_font_size())
+        self.opacity.set(int(config.get_opacity() * 100))
 
-    def _validate_int(self, value: str) -> bool:
-        """验证整数值输入"""
-        if value == "":
-            return True
+    def _parse(self, spinbox, lo, hi, kind, name: str):
+        """
+        解析并校验输入框中的数值
+        
+        :param spinbox: 输入控件
+        :param lo: 最小值
+        :param hi: 最大值
+        :param kind: 数值类型（int 或 float）
+        :param name: 设置项名称（用于错误提示）
+        :return: 转换后的数值
+        """
+        raw = spinbox.get().strip()
         try:
-            num = int(value)
-            return num > 0
+            value = kind(raw)
         except ValueError:
-            return False
+            raise ValueError(f"{name}必须是{'整数' if kind is int else '数字'}: {raw!r}")
+        if not lo <= value <= hi:
+            raise ValueError(f"{name}必须在 {lo} 到 {hi} 之间: {raw}")
+        return value
 
     def save_settings(self):
         """保存设置"""
         try:
+            # 先校验全部输入，避免部分设置被写入
+            cpu_threshold = self._parse(self.cpu_threshold, 50, 100, float, "CPU阈值")
+            gpu_threshold = self._parse(self.gpu_threshold, 60, 110, float, "GPU阈值")
+            ssd_threshold = self._parse(self.ssd_threshold, 40, 80, float, "SSD阈值")
+            cooldown_minutes = self._parse(self.alert_cooldown, 1, 60, int, "告警冷却时间")
+            update_interval = self._parse(self.update_interval, 1, 60, float, "更新间隔")
+            font_size = self._parse(self.font_size, 8, 20, int, "字体大小")
+            
             # 保存阈值
-            self.app.config.set_threshold('CPU', float(self.cpu_threshold.get()))
-            self.app.config.set_threshold('GPU', float(self.gpu_threshold.get()))
-            self.app.config.set_threshold('SSD', float(self.ssd_threshold.get()))
+            self.app.config.set_threshold('CPU', cpu_threshold)
+            self.app.config.set_threshold('GPU', gpu_threshold)
+            self.app.config.set_threshold('SSD', ssd_threshold)
             
             # 保存常规设置
-            self.app.config.set_update_interval(float(self.update_interval.get()))
+            self.app.config.set_update_interval(update_interval)
             self.app.config.set_start_minimized(self.start_minimized.get())
             self.app.config.set_log_temperatures(self.log_temps.get())
             
             # 保存告警冷却时间（转换为秒）
-            cooldown_minutes = int(self.alert_cooldown.get())
             self.app.config.set_alert_cooldown(cooldown_minutes * 60)
             
             # 保存外观设置
             self.app.config.set_theme(self.theme.get().lower())
-            self.app.config.set_font_size(int(self.font_size.get()))
+            self.app.config.set_font_size(font_size)
             self.app.config.set_opacity(self.opacity.get() / 100.0)
             
             # 启用/禁用声音
@@ -253,26 +269,34 @@ class SettingsWindow:
             # 通知主应用设置已更改
             self.on_save()
             
-            # 关闭窗口
-            self.close()
-            
-            messagebox.showinfo("设置", "设置已成功保存！")
+            # 显示提示后稍后自动关闭窗口
+            self._set_status("设置已成功保存！", '#27ae60')
+            self._close_after = self.window.after(1000, self.close)
             
         except Exception as e:
             self.logger.error(f"保存设置失败: {str(e)}")
-            messagebox.showerror("错误", f"保存设置时出错: {str(e)}")
+            self._set_status(f"保存设置时出错: {str(e)}", '#e74c3c')
 
     def show(self):
-        """显示窗口"""
-        if self.window.winfo_exists():
-            self.window.deiconify()
-        else:
+        """显示窗口（首次显示时创建控件，之后复用）"""
+        if self.window is None or not self.window.winfo_exists():
             self._create_window()
+        else:
+            self._refresh_values()
+            self.window.deiconify()
+            self.window.grab_set()
         self.logger.info("显示设置窗口")
 
+    def _cancel_pending_close(self):
+        """取消保存后尚未执行的自动关闭"""
+        if self._close_after is not None:
+            self.window.after_cancel(self._close_after)
+            self._close_after = None
+
     def close(self):
-        """关闭窗口"""
-        if self.window.winfo_exists():
+        """关闭窗口（隐藏而不销毁，下次打开时直接复用）"""
+        if self.window is not None and self.window.winfo_exists():
+            self._cancel_pending_close()
             self.window.grab_release()
-            self.window.destroy()
+            self.window.withdraw()
         self.logger.info("关闭设置窗口")
\ No newline at end of file
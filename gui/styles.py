@@ -0,0 +1,51 @@
+# gui/styles.py
+"""
+界面样式配置
+ttk.Style 为每个Tk解释器共享，样式只需在根窗口创建后配置一次
+"""
+
+from tkinter import ttk
+
+# 已配置样式的根窗口（根窗口重建时需要重新配置）
+_configured_root = None
+
+def configure_once(root):
+    """
+    为指定根窗口配置所有界面样式（重复调用时直接返回）
+    
+    :param root: Tk根窗口
+    """
+    global _configured_root
+    if root is _configured_root:
+        return
+    
+    style = ttk.Style(root)
+    
+    # 悬浮窗关闭按钮样式
+    style.configure(
+        'Close.TButton', 
+        background='#e74c3c', 
+        foreground='white',
+        font=("Arial", 8, "bold")
+    )
+    
+    # 悬浮窗设置按钮样式
+    style.configure(
+        'Settings.TButton', 
+        background='#3498db', 
+        foreground='white',
+        font=("Arial", 8)
+    )
+    
+    # 告警窗口按钮样式
+    style.configure(
+        'Alert.TButton', 
+        background='#c0392b', 
+        foreground='white',
+        font=("Arial", 10, "bold")
+    )
+    
+    # 设置窗口保存按钮样式
+    style.configure('Accent.TButton', background='#3498db', foreground='white')
+    
+    _configured_root = root
@@ -6,9 +6,19 @@
 
 import threading
 import logging
+import time
+from collections import deque
 from pystray import Icon, Menu, MenuItem
-from PIL import Image, ImageDraw, ImageFont
-from utils.helpers import create_tray_image
+from utils.helpers import create_tray_image, clamp
+
+
+# 自适应刷新间隔参数
+MIN_TRAY_INTERVAL = 1.0       # 最短刷新间隔（秒）
+MAX_TRAY_INTERVAL = 30.0      # 最长刷新间隔（秒）
+VOLATILE_SPREAD = 2.0         # 近期温度波动超过该值（°C）时加快刷新
+STABLE_SPREAD = 0.2           # 近期温度波动低于该值（°C）时放慢刷新
+TREND_WINDOW = 5              # 计算波动所用的采样数
+
 
 class TrayIconManager:
     def __init__(self, app, update_interval=10):
@@ -16,16 +26,27 @@ class TrayIconManager:
         初始化托盘图标管理器
         
         :param app: 主应用实例
-        :param update_interval: 状态更新间隔（秒）
+        :param update_interval: 状态更新的基础间隔（秒），实际间隔随温度波动自适应调整
         """
         self.logger = logging.getLogger("TrayIcon")
         self.app = app
+        # 近期CPU温度采样，用于根据波动程度自适应调整刷新间隔
+        self._cpu_history = deque(maxlen=TREND_WINDOW)
+        # 唤醒事件：刷新间隔缩短或告警状态变化时，立即唤醒正在等待的刷新循环
+        self._wake = threading.Event()
+        # 上次刷新时图标是否显示告警
+        self._alert_shown = False
         self.update_interval = update_interval
         self.is_running = True
+        # 停止事件：用于可中断的等待，stop() 时立即唤醒后台循环
+        self._stop_event = threading.Event()
         self.icon = None
         self.current_text = "初始化..."
         
-        # 创建初始图像
+        # 告警闪烁图像固定不变，预先渲染
+        self._alert_icon = create_tray_image("!", bg_color="red")
+        
+        # 创建初始图像（create_tray_image 按文本缓存，相同温度直接复用）
         self.image = create_tray_image(self.current_text)
         
         # 设置菜单
@@ -33,6 +54,35 @@ class TrayIconManager:
         
         self.logger.info("托盘图标管理器初始化完成")
 
+    @property
+    def update_interval(self) -> float:
+        """配置的基础刷新间隔（秒）"""
+        return self._base_interval
+
+    @update_interval.setter
+    def update_interval(self, value: float):
+        """设置基础刷新间隔，并以此重置自适应间隔"""
+        self._base_interval = value
+        old_interval = getattr(self, '_interval', None)
+        self._interval = clamp(value, MIN_TRAY_INTERVAL, MAX_TRAY_INTERVAL)
+        self._cpu_history.clear()
+        if old_interval is not None and self._interval < old_interval:
+            self._wake.set()
+
+    def _adapt_interval(self, allow_grow: bool):
+        """
+        根据近期温度波动调整刷新间隔：波动大时减半，稳定时加倍
+        
+        :param allow_grow: 是否允许放慢刷新（仅在实际刷新时放慢，波动时则立即加快）
+        """
+        if len(self._cpu_history) < 2:
+            return
+        spread = max(self._cpu_history) - min(self._cpu_history)
+        if spread > VOLATILE_SPREAD:
+            self._interval = max(MIN_TRAY_INTERVAL, self._interval / 2)
+        elif spread < STABLE_SPREAD and allow_grow:
+            self._interval = min(MAX_TRAY_INTERVAL, self._interval * 2)
+
     def _create_menu(self) -> Menu:
         """创建托盘图标菜单"""
         return Menu(
@@ -53,11 +103,14 @@ class TrayIconManager:
             title="硬件温度监控"
         )
         
-        # 启动更新线程
-        threading.Thread(target=self.update_loop, daemon=True).start()
+        # 订阅监控线程的采样结果（仅记录温度趋势，不在监控线程中渲染）
+        self.app.register_listener(self.on_sample)
         
         # 在单独线程中运行图标
         threading.Thread(target=self.icon.run, daemon=True).start()
+        
+        # 托盘状态按自身的（较低）频率刷新，与传感器采样频率无关
+        threading.Thread(target=self._refresh_loop, daemon=True, name="TrayRefresh").start()
         self.logger.info("托盘图标已启动")
 
     def update_icon(self, text: str):
@@ -66,6 +119,10 @@ class TrayIconManager:
         
         :param text: 要显示的文本（如"CPU: 45°C"）
         """
+        # 文本未变化时无需重新渲染
+        if text == self.current_text:
+            return
+        
         self.current_text = text
         if not self.icon:
             return
@@ -90,17 +147,19 @@ class TrayIconManager:
             
         def blink_task():
             original_icon = self.icon.icon
-            alert_icon = create_tray_image("!", bg_color="red")
+            alert_icon = self._alert_icon
             
             for _ in range(times):
                 try:
                     self.icon.icon = alert_icon
                     self.icon.title = f"⚠️ {message}"
-                    threading.Event().wait(interval)
+                    if self._stop_event.wait(interval):
+                        break
                     
                     self.icon.icon = original_icon
                     self.icon.title = "硬件温度监控"
-                    threading.Event().wait(interval)
+                    if self._stop_event.wait(interval):
+                        break
                 except Exception as e:
                     self.logger.error(f"闪烁托盘图标失败: {str(e)}")
                     break
@@ -115,34 +174,76 @@ class TrayIconManager:
         # 在后台线程中运行闪烁
         threading.Thread(target=blink_task, daemon=True).start()
 
-    def update_loop(self):
-        """定期更新托盘图标状态"""
-        while self.is_running:
-            try:
-                # 获取当前温度数据
-                temps = self.app.monitor.get_current_temperatures()
-                
-                # 格式化文本（显示CPU温度）
-                cpu_temp = temps.get('CPU', '--')
-                text = f"CPU: {cpu_temp}°C"
-                
-                # 如果有告警，添加感叹号
-                if any(self.app.alert_system.is_alert_active(dev) for dev in temps):
-                    text = "⚠️ " + text
-                
-                # 更新图标
-                self.update_icon(text)
-                
-                # 等待更新间隔
-                threading.Event().wait(self.update_interval)
-                
-            except Exception as e:
-                self.logger.error(f"托盘更新循环出错: {str(e)}")
-                threading.Event().wait(5)  # 出错后等待5秒
+    def on_sample(self, temps: dict):
+        """
+        监控线程每次采样后调用，只记录CPU温度趋势
+        
+        :param temps: 当前温度字典
+        """
+        cpu_sample = temps.get('CPU')
+        if cpu_sample is not None:
+            self._cpu_history.append(cpu_sample)
+        
+        # 温度剧烈变化时立即缩短间隔，并唤醒刷新循环按新间隔重新计时
+        old_interval = self._interval
+        self._adapt_interval(allow_grow=False)
+        if self._interval < old_interval:
+            self._wake.set()
+        
+        # 告警状态变化时立即刷新（显示或移除告警标记）
+        if self._has_alert(temps) != self._alert_shown:
+            self._wake.set()
+
+    def _has_alert(self, temps: dict) -> bool:
+        """是否有设备处于告警状态"""
+        return any(self.app.alert_system.is_alert_active(dev) for dev in temps)
+
+    def _refresh_loop(self):
+        """托盘刷新循环：启动后立即刷新一次，之后按自适应间隔读取最新温度并更新图标"""
+        while not self._stop_event.is_set():
+            self.refresh(self.app.current_temps)
+            last_refresh = time.monotonic()
+            
+            # 等待到下次刷新；间隔缩短时被唤醒，按当前间隔重新计算剩余时间
+            while True:
+                remaining = last_refresh + self._interval - time.monotonic()
+                if remaining <= 0 or self._stop_event.is_set():
+                    break
+                if self._wake.wait(remaining):
+                    self._wake.clear()
+                    # 告警状态变化需要立即刷新
+                    if self._has_alert(self.app.current_temps) != self._alert_shown:
+                        break
+            
+            self._adapt_interval(allow_grow=True)
+
+    def refresh(self, temps: dict):
+        """
+        根据温度更新托盘图标状态
+        
+        :param temps: 当前温度字典
+        """
+        try:
+            # 格式化文本（显示CPU温度）
+            cpu_temp = temps.get('CPU', '--')
+            text = f"CPU: {cpu_temp}°C"
+            
+            # 如果有告警，添加感叹号
+            self._alert_shown = self._has_alert(temps)
+            if self._alert_shown:
+                text = "⚠️ " + text
+            
+            # 更新图标
+            self.update_icon(text)
+            
+        except Exception as e:
+            self.logger.error(f"更新托盘状态出错: {str(e)}")
 
     def stop(self):
         """停止托盘图标"""
         self.is_running = False
+        self._stop_event.set()
+        self._wake.set()
         if self.icon:
             self.icon.stop()
         self.logger.info("托盘图标已停止")
\ No newline at end of file
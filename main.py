@@ -8,34 +8,32 @@ import os
 import time
 import threading
 import logging
+import csv
+import subprocess
+from collections import deque
 from datetime import datetime
 from core import hardware_reader, config_manager, alert_system
 from gui import tray_icon, floating_window, settings_window
+from gui._marshal import post
 from utils import notification, logger as log_util
 
-# 简化的虚拟环境检查
-def in_virtual_environment():
-    """检查是否在虚拟环境中运行"""
-    # 检查 Conda 环境变量
-    if os.environ.get('CONDA_DEFAULT_ENV'):
-        return True
-    
-    # 检查虚拟环境目录是否存在
-    if hasattr(sys, 'real_prefix'):
-        return True
-    
-    # 检查 base_prefix 是否与 prefix 不同
-    if hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix:
-        return True
-    
-    # 检查虚拟环境目录是否存在（备用方法）
-    if 'VIRTUAL_ENV' in os.environ:
-        return True
-    
-    return False
+# 是否运行在Windows上（启动时确定一次）
+_IS_WIN32 = sys.platform == "win32"
+
+if _IS_WIN32:
+    import ctypes
+    _SHELL32 = ctypes.windll.shell32
+
+# 是否在虚拟环境中运行（Conda、venv/virtualenv，启动时确定一次）
+_IN_VENV = bool(
+    os.environ.get('CONDA_DEFAULT_ENV')
+    or os.environ.get('VIRTUAL_ENV')
+    or getattr(sys, 'real_prefix', None)
+    or getattr(sys, 'base_prefix', sys.prefix) != sys.prefix
+)
 
-# 显示虚拟环境警告
-if not in_virtual_environment():
+# 显示虚拟环境警告（打包/服务等非交互部署可设置 HWMON_SKIP_VENV_CHECK 跳过）
+if not _IN_VENV and not os.environ.get('HWMON_SKIP_VENV_CHECK'):
     print("警告：未在虚拟环境中运行！")
     print("这可能导致依赖冲突和不可预测的行为。")
     print("请使用以下命令激活虚拟环境：")
@@ -43,20 +41,31 @@ if not in_virtual_environment():
     print("或使用 run.bat 脚本启动程序")
     
     # 等待用户确认
-    if sys.platform == "win32":
+    if _IS_WIN32:
         input("按 Enter 继续运行（不推荐）或 Ctrl+C 退出...")
     else:
         print("按 Enter 继续运行（不推荐）或 Ctrl+C 退出...")
         input()
 
 # 解决Windows系统DPI缩放问题
-if sys.platform == "win32":
+if _IS_WIN32:
     try:
         from ctypes import windll
         windll.shcore.SetProcessDpiAwareness(1)
     except Exception as e:
         print(f"DPI设置失败: {str(e)}")
 
+# 温度日志写缓冲大小（字节）及定期刷新的写入条数
+LOG_BUFFER_SIZE = 64 * 1024
+LOG_FLUSH_EVERY = 30
+LOG_HEADER = ('timestamp', 'CPU', 'GPU', 'SSD')
+
+# 保留的告警历史条数
+ALERT_HISTORY_SIZE = 100
+
+# 退出时等待后台线程结束的最长时间（秒）
+SHUTDOWN_TIMEOUT = 2.0
+
 # 创建并运行应用
 class MonitorApp:
     def __init__(self):
@@ -66,17 +75,28 @@ class MonitorApp:
         self.logger.info("应用程序启动中...")
         
         # 检查管理员权限（Windows需要管理员权限读取硬件）
-        if sys.platform == "win32" and not self.is_admin():
+        if _IS_WIN32 and not self.is_admin():
             self.logger.warning("尝试以管理员权限重新运行")
             self.run_as_admin()
         
         # 加载配置
         self.config = config_manager.ConfigManager()
+        self._refresh_cached_config()
+        
+        # 温度日志文件句柄（常驻打开，由缓冲区合并写入）
+        self._log_lock = threading.Lock()
+        self._log_fh = None
+        self._log_fh_path = None
+        self._log_writer = None
+        self._log_writes = 0
+        self._open_temp_log()
         
         # 初始化硬件监控
         self.hardware_reader = hardware_reader.HardwareReader()
         self.hardware_names = self.hardware_reader.get_hardware_names()
-        self.logger.info(f"检测到的硬件: {self.hardware_names}")
+        self.logger.info("检测到的硬件: %s", self.hardware_names)
+        # 传感器在后台线程中轮询，监控循环只读取最近一次结果
+        self.hardware_reader.start_polling(self._update_interval)
         
         # 初始化告警系统
         self.alert_system = alert_system.AlertSystem(self.config)
@@ -85,15 +105,16 @@ class MonitorApp:
         self.notifier = notification.NotificationManager("硬件温度监控")
         
         # 初始化GUI组件
-        self.tray_icon = tray_icon.TrayIconManager(self, self.config.get_update_interval())
+        self.tray_icon = tray_icon.TrayIconManager(self, self._tray_interval())
         self.floating_win = floating_window.FloatingWindow(self, self.on_floating_window_close)
         self.settings_win = None
         
-        # 监控状态
-        self.is_running = True
-        self.last_update_time = 0
+        # 监控状态（设置停止事件即请求监控线程退出）
+        self._stop_event = threading.Event()
         self.current_temps = {}
-        self.alert_history = []
+        # 告警历史（保留最近 ALERT_HISTORY_SIZE 条，超出时自动丢弃最旧的）
+        self.alert_history = deque(maxlen=ALERT_HISTORY_SIZE)
+        self._sample_listeners = []
         
         # 启动监控线程
         self.monitor_thread = threading.Thread(
@@ -109,6 +130,10 @@ class MonitorApp:
         # 设置通知系统的托盘图标引用
         self.notifier.set_tray_icon(self.tray_icon.icon)
         
+        # 悬浮窗在UI线程中按自身频率定时刷新，与传感器采样频率无关
+        self._refresh_root = None
+        self._start_floating_refresh()
+        
         # 检查是否最小化启动
         if not self.config.get_start_minimized():
             self.show_floating_window()
@@ -116,89 +141,175 @@ class MonitorApp:
         self.logger.info("应用程序启动完成")
 
     def monitor_loop(self):
-        """主监控循环"""
-        while self.is_running:
+        """主监控循环（按绝对截止时间调度，采样周期不受处理耗时影响）"""
+        log = self.logger
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
             try:
                 # 获取当前温度
                 self.current_temps = self.hardware_reader.get_all_temperatures()
-                self.logger.debug(f"当前温度: {self.current_temps}")
+                log.debug("当前温度: %s", self.current_temps)
                 
-                # 更新UI
-                self.update_ui()
+                # 通知采样订阅者（如托盘图标）
+                self._notify_listeners()
                 
                 # 检查告警
                 self.check_alerts()
                 
                 # 记录温度（如果配置启用）
-                if self.config.get_log_temperatures():
+                if self._log_temps_enabled:
                     self.log_temperatures()
                 
             except Exception as e:
-                self.logger.error(f"监控循环出错: {str(e)}", exc_info=True)
+                log.error("监控循环出错: %s", e, exc_info=True)
             
-            # 按配置间隔休眠
-            time.sleep(self.config.get_update_interval())
+            # 休眠到下一个采样时刻；落后时直接从当前时刻重新计时，避免连续补采
+            deadline += self._update_interval
+            slack = deadline - time.monotonic()
+            if slack > 0:
+                # 可中断的等待：退出时立即返回
+                if self._stop_event.wait(slack):
+                    break
+            else:
+                deadline = time.monotonic()
+    
+    @property
+    def is_running(self) -> bool:
+        """应用是否仍在运行"""
+        return not self._stop_event.is_set()
     
-    def update_ui(self):
-        """更新所有UI元素"""
+    def _refresh_cached_config(self):
+        """读取监控循环和定时刷新用到的配置（仅在启动和保存设置时调用）"""
+        self._update_interval = self.config.get_update_interval()
+        self._log_temps_enabled = self.config.get_log_temperatures()
+        self._log_path = self.config.get_log_path()
+        # 悬浮窗定时刷新间隔（毫秒）
+        self._ui_interval_ms = int(1000 / max(self.config.get_ui_refresh_hz(), 0.1))
+    
+    def _tray_interval(self) -> float:
+        """托盘图标刷新的基础间隔（秒）"""
+        return 1.0 / max(self.config.get_tray_refresh_hz(), 0.01)
+    
+    def _start_floating_refresh(self):
+        """在当前悬浮窗根窗口上启动定时刷新（窗口重建后需重新启动）"""
+        self._refresh_root = self.floating_win.window
+        self._refresh_root.after(self._ui_interval_ms, self._refresh_floating)
+    
+    def _refresh_floating(self):
+        """在UI线程中定时用最新温度刷新悬浮窗"""
+        if not self.is_running or not self.floating_win.alive:
+            return
         try:
-            # 更新悬浮窗
-            if self.floating_win.window.winfo_exists():
-                self.floating_win.update_temps(self.current_temps)
-            
-            # 更新托盘图标（每10次更新一次）
-            current_time = time.time()
-            if current_time - self.last_update_time > 10:
-                cpu_temp = self.current_temps.get('CPU', '--')
-                tray_text = f"CPU: {cpu_temp}°C"
-                self.tray_icon.update_icon(tray_text)
-                self.last_update_time = current_time
-        
+            self.floating_win.update_temps(self.current_temps)
         except Exception as e:
-            self.logger.error(f"更新UI出错: {str(e)}")
+            self.logger.error("更新UI出错: %s", e)
+        self.floating_win.window.after(self._ui_interval_ms, self._refresh_floating)
+    
+    def register_listener(self, callback):
+        """
+        订阅温度采样结果
+        
+        :param callback: 回调函数，参数为当前温度字典（在监控线程中调用）
+        """
+        self._sample_listeners.append(callback)
+    
+    def _notify_listeners(self):
+        """将最新采样推送给所有订阅者"""
+        for callback in self._sample_listeners:
+            try:
+                callback(self.current_temps)
+            except Exception as e:
+                self.logger.error("采样回调失败: %s", e)
     
     def check_alerts(self):
         """检查并处理告警"""
         alerts = self.alert_system.check_thresholds(self.current_temps)
-        for alert in alerts:
+        for device, alert in alerts:
             # 记录告警历史
             self.alert_history.append({
                 'time': datetime.now(),
                 'message': alert
             })
             
-            # 保留最近100条告警
-            if len(self.alert_history) > 100:
-                self.alert_history.pop(0)
-            
             self.logger.warning(alert)
             self.notifier.send_alert(alert)
             
             # 如果悬浮窗未显示，闪烁托盘图标
-            if not self.floating_win.window.winfo_exists():
+            if not self.floating_win.alive:
                 self.tray_icon.blink_icon(alert)
     
+    def _open_temp_log(self):
+        """
+        按配置打开温度日志文件：未启用记录时关闭文件，路径变化时重新打开
+        """
+        path = self._log_path
+        with self._log_lock:
+            if not self._log_temps_enabled:
+                self._close_temp_log_locked()
+                return
+            if self._log_fh is not None and path == self._log_fh_path:
+                return
+            self._close_temp_log_locked()
+            try:
+                log_dir = os.path.dirname(path)
+                if log_dir:
+                    os.makedirs(log_dir, exist_ok=True)
+                self._log_fh = open(path, "a", buffering=LOG_BUFFER_SIZE, encoding="utf-8", newline="")
+                self._log_fh_path = path
+                self._log_writer = csv.writer(self._log_fh)
+                # 新文件先写入表头
+                if self._log_fh.tell() == 0:
+                    self._log_writer.writerow(LOG_HEADER)
+            except Exception as e:
+                self.logger.error("打开温度日志文件失败: %s", e)
+    
+    def _close_temp_log_locked(self):
+        """刷新并关闭温度日志文件（调用方需持有 _log_lock）"""
+        if self._log_fh is None:
+            return
+        try:
+            self._log_fh.flush()
+            self._log_fh.close()
+        except Exception as e:
+            self.logger.error("关闭温度日志文件失败: %s", e)
+        self._log_fh = None
+        self._log_fh_path = None
+        self._log_writer = None
+        self._log_writes = 0
+    
     def log_temperatures(self):
-        """记录温度到CSV文件"""
+        """记录温度到CSV文件（写入缓冲区，每 LOG_FLUSH_EVERY 条刷新一次）"""
         try:
-            timestamp = datetime.now().isoformat()
-            log_entry = f"{timestamp}, "
-            log_entry += f"{self.current_temps.get('CPU', '')}, "
-            log_entry += f"{self.current_temps.get('GPU', '')}, "
-            log_entry += f"{self.current_temps.get('SSD', '')}\n"
-            
-            # 确保数据目录存在
-            if not os.path.exists("data"):
-                os.makedirs("data")
+            temps = self.current_temps
+            row = (
+                datetime.now().isoformat(),
+                temps.get('CPU', ''),
+                temps.get('GPU', ''),
+                temps.get('SSD', '')
+            )
             
-            with open(self.config.get_log_path(), "a", encoding="utf-8") as log_file:
-                log_file.write(log_entry)
+            with self._log_lock:
+                if self._log_writer is None:
+                    return
+                self._log_writer.writerow(row)
+                self._log_writes += 1
+                # 定期刷新，限制程序崩溃时丢失的数据量
+                if self._log_writes >= LOG_FLUSH_EVERY:
+                    self._log_fh.flush()
+                    self._log_writes = 0
         except Exception as e:
-            self.logger.error(f"记录温度失败: {str(e)}")
+            self.logger.error("记录温度失败: %s", e)
     
     def show_floating_window(self):
-        """显示悬浮窗"""
+        """显示悬浮窗（可由托盘菜单线程调用）"""
+        post(self.floating_win.window, self._show_floating_window)
+    
+    def _show_floating_window(self):
+        """在UI线程中显示悬浮窗"""
         self.floating_win.show()
+        # 根窗口被重建时，原窗口上的定时刷新已随之销毁，需要重新启动
+        if self._refresh_root is not self.floating_win.window:
+            self._start_floating_refresh()
         self.floating_win.update_temps(self.current_temps)
         self.logger.info("显示悬浮窗")
     
@@ -207,8 +318,12 @@ class MonitorApp:
         self.logger.info("悬浮窗已关闭")
     
     def show_settings(self):
-        """显示设置窗口"""
-        if self.settings_win is None or not self.settings_win.window.winfo_exists():
+        """显示设置窗口（可由托盘菜单线程调用）"""
+        post(self.floating_win.window, self._show_settings)
+    
+    def _show_settings(self):
+        """在UI线程中显示设置窗口"""
+        if self.settings_win is None:
             self.settings_win = settings_window.SettingsWindow(
                 self,
                 on_save=self.on_settings_saved
@@ -224,11 +339,21 @@ class MonitorApp:
         self.alert_system.update_config()
         self.notifier.reset_alerts()
         
-        # 更新监控间隔
-        self.tray_icon.update_interval = self.config.get_update_interval()
+        # 刷新缓存的配置
+        self._refresh_cached_config()
+        
+        # 更新传感器轮询间隔
+        self.hardware_reader.set_poll_interval(self._update_interval)
+        
+        # 日志记录开关或路径变化时打开/关闭日志文件
+        self._open_temp_log()
+        
+        # 更新托盘刷新间隔
+        self.tray_icon.update_interval = self._tray_interval()
         
         # 更新悬浮窗（如果显示）
-        if self.floating_win.window.winfo_exists():
+        self.floating_win.on_config_changed()
+        if self.floating_win.alive:
             self.floating_win.update_temps(self.current_temps)
     
     def show_about(self):
@@ -238,50 +363,60 @@ class MonitorApp:
         self.notifier.send_alert("硬件温度监控 v1.0\n作者: 您的名字")
     
     def quit(self):
-        """退出应用程序"""
+        """退出应用程序（可由托盘菜单线程调用）"""
         self.logger.info("正在退出应用程序...")
-        self.is_running = False
         
-        # 保存配置
-        self.config.save()
+        # 通知监控线程退出并等待其结束，避免退出时仍在读取传感器或写日志
+        self._stop_event.set()
+        if threading.current_thread() is not self.monitor_thread:
+            self.monitor_thread.join(timeout=SHUTDOWN_TIMEOUT)
+        self.hardware_reader.close(timeout=SHUTDOWN_TIMEOUT)
         
-        # 关闭所有窗口
-        if self.floating_win.window.winfo_exists():
-            self.floating_win.close()
+        # 保存配置
+        self.config.flush()
         
-        if self.settings_win and self.settings_win.window.winfo_exists():
-            self.settings_win.close()
+        # 写出缓冲的温度日志
+        with self._log_lock:
+            self._close_temp_log_locked()
         
         # 关闭托盘图标
         self.tray_icon.stop()
         
-        self.logger.info("应用程序已退出")
-        sys.exit(0)
+        # 关闭所有窗口并结束Tk主循环（投递到UI线程执行），主线程随后退出
+        if self.floating_win.alive:
+            post(self.floating_win.window, self._close_windows)
+    
+    def _close_windows(self):
+        """在UI线程中关闭所有窗口，并结束主循环使 mainloop() 返回"""
+        if self.settings_win:
+            self.settings_win.close()
+        root = self.floating_win.window
+        root.quit()
+        root.destroy()
     
     def is_admin(self) -> bool:
         """检查是否以管理员权限运行（仅Windows）"""
-        if sys.platform != "win32":
+        if not _IS_WIN32:
             return True
             
         try:
-            import ctypes
-            return ctypes.windll.shell32.IsUserAnAdmin() != 0
+            return bool(_SHELL32.IsUserAnAdmin())
         except:
             return False
     
     def run_as_admin(self):
         """以管理员权限重新运行程序（仅Windows）"""
-        if sys.platform != "win32":
+        if not _IS_WIN32:
             return
             
         try:
-            import ctypes
-            ctypes.windll.shell32.ShellExecuteW(
-                None, "runas", sys.executable, " ".join(sys.argv), None, 1
+            # list2cmdline 正确处理含空格的参数
+            _SHELL32.ShellExecuteW(
+                None, "runas", sys.executable, subprocess.list2cmdline(sys.argv), None, 1
             )
             sys.exit(0)
         except Exception as e:
-            self.logger.error(f"请求管理员权限失败: {str(e)}")
+            self.logger.error("请求管理员权限失败: %s", e)
             sys.exit(1)
 
 if __name__ == "__main__":
@@ -296,6 +431,10 @@ if __name__ == "__main__":
             # 如果没有显示悬浮窗，保持主线程运行
             while app.is_running:
                 time.sleep(1)
+        
+        # 主循环结束后记录退出日志，并写出队列中剩余的日志
+        app.logger.info("应用程序已退出")
+        log_util.shutdown_logging()
     except Exception as e:
         import traceback
         print(f"应用程序崩溃: {str(e)}")
@@ -5,18 +5,47 @@
 """
 
 import os
+import re
+import math
 import sys
+import time
 import platform
+import subprocess
 import ctypes
 import psutil
 import logging
+import functools
 from typing import Dict, Any, Optional, Union
 
 # 获取记录器
 logger = logging.getLogger("Helpers")
 
+# 运行平台（模块加载时确定一次）
+_IS_WINDOWS = platform.system() == "Windows"
+_SHELL32 = ctypes.windll.shell32 if _IS_WINDOWS else None
+
+# 电子邮件格式（模块加载时编译一次）
+_EMAIL_RE = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+
+# 字节单位及 ln(1024)（bytes_to_human 直接计算单位下标）
+_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+_LN1024 = math.log(1024)
+
+# 系统信息缓存（时间戳, 信息），有效期内不再重复枚举磁盘和查询WMI
+SYSTEM_INFO_TTL = 30.0
+_sys_info_cache = (0.0, None)
+
+# 托盘图标默认字体（首次使用时加载一次）
+_FONT = None
+
 def get_system_info() -> Dict[str, Any]:
-    """获取详细的系统信息"""
+    """获取详细的系统信息（结果缓存 SYSTEM_INFO_TTL 秒）"""
+    global _sys_info_cache
+    now = time.monotonic()
+    ts, cached = _sys_info_cache
+    if cached is not None and now - ts < SYSTEM_INFO_TTL:
+        return cached
+    
     try:
         info = {}
         uname = platform.uname()
@@ -54,7 +83,7 @@ def get_system_info() -> Dict[str, Any]:
         info['disks'] = disks
         
         # GPU信息（Windows特定）
-        if platform.system() == "Windows":
+        if _IS_WINDOWS:
             try:
                 import wmi
                 w = wmi.WMI()
@@ -69,6 +98,7 @@ def get_system_info() -> Dict[str, Any]:
             except ImportError:
                 logger.warning("无法获取GPU信息: wmi模块未安装")
         
+        _sys_info_cache = (now, info)
         return info
     except Exception as e:
         logger.error(f"获取系统信息失败: {str(e)}")
@@ -76,15 +106,18 @@ def get_system_info() -> Dict[str, Any]:
 
 def bytes_to_human(size: int, precision: int = 2) -> str:
     """将字节大小转换为易读格式"""
-    units = ['B', 'KB', 'MB', 'GB', 'TB', 'PB']
     size = float(size)
+    if size < 1024.0:
+        return f"{size:.{precision}f} B"
     
-    for unit in units:
-        if size < 1024.0 or unit == units[-1]:
-            break
-        size /= 1024.0
+    idx = min(len(_UNITS) - 1, int(math.log(size) / _LN1024))
+    value = size / (1024 ** idx)
+    # 浮点误差可能使恰好为1024整数次幂的值少算一级
+    if value >= 1024.0 and idx < len(_UNITS) - 1:
+        idx += 1
+        value /= 1024.0
     
-    return f"{size:.{precision}f} {unit}"
+    return f"{value:.{precision}f} {_UNITS[idx]}"
 
 def celsius_to_fahrenheit(c: float) -> float:
     """摄氏度转华氏度"""
@@ -93,8 +126,8 @@ def celsius_to_fahrenheit(c: float) -> float:
 def is_admin() -> bool:
     """检查程序是否以管理员权限运行"""
     try:
-        if platform.system() == "Windows":
-            return ctypes.windll.shell32.IsUserAnAdmin() != 0
+        if _IS_WINDOWS:
+            return bool(_SHELL32.IsUserAnAdmin())
         else:
             return os.getuid() == 0  # Unix系统检查root
     except Exception:
@@ -102,7 +135,7 @@ def is_admin() -> bool:
 
 def run_as_admin():
     """以管理员权限重新运行程序（仅Windows）"""
-    if platform.system() != "Windows":
+    if not _IS_WINDOWS:
         logger.warning("仅支持Windows系统的管理员权限提升")
         return False
     
@@ -111,54 +144,73 @@ def run_as_admin():
         
     try:
         # 请求UAC提升
-        ctypes.windll.shell32.ShellExecuteW(
-            None, "runas", sys.executable, " ".join(sys.argv), None, 1
+        # list2cmdline 正确处理含空格的参数
+        _SHELL32.ShellExecuteW(
+            None, "runas", sys.executable, subprocess.list2cmdline(sys.argv), None, 1
         )
         sys.exit(0)  # 退出当前实例
     except Exception as e:
         logger.error(f"请求管理员权限失败: {str(e)}")
         return False
 
-def create_tray_image(text: str, size: tuple = (64, 64), bg_color: str = "black", text_color: str = "white") -> Any:
+def _get_tray_font() -> Any:
+    """获取托盘图标默认字体（只从磁盘加载一次）"""
+    global _FONT
+    if _FONT is None:
+        from PIL import ImageFont
+        try:
+            _FONT = ImageFont.truetype("arial.ttf", 16)
+        except Exception:
+            # 回退到默认字体
+            _FONT = ImageFont.load_default()
+    return _FONT
+
+def create_tray_image(text: str, size: tuple = (64, 64), bg_color: str = "black", text_color: str = "white", font: Any = None) -> Any:
     """
     创建托盘图标图像（带温度文本）
     
+    相同参数的结果会被缓存复用，调用方不应修改返回的图像
+    
     :param text: 显示的文本
     :param size: 图像尺寸
     :param bg_color: 背景颜色
     :param text_color: 文本颜色
-    :return: PIL.Image对象
+    :param font: 字体（为None时使用默认字体）
+    :return: PIL.Image对象，创建失败时返回None
     """
     try:
-        from PIL import Image, ImageDraw, ImageFont
+        return _render_tray_image(text, size, bg_color, text_color, font)
     except ImportError:
         logger.error("PIL模块未安装，无法创建托盘图标")
         return None
-    
-    try:
-        # 创建图像
-        image = Image.new('RGB', size, bg_color)
-        dc = ImageDraw.Draw(image)
-        
-        # 尝试加载字体
-        try:
-            font = ImageFont.truetype("arial.ttf", 16)
-        except:
-            # 回退到默认字体
-            font = ImageFont.load_default()
-        
-        # 计算文本位置（居中）
-        text_width, text_height = dc.textsize(text, font=font)
-        position = ((size[0] - text_width) // 2, (size[1] - text_height) // 2)
-        
-        # 绘制文本
-        dc.text(position, text, fill=text_color, font=font)
-        
-        return image
     except Exception as e:
         logger.error(f"创建托盘图标失败: {str(e)}")
         return None
 
+@functools.lru_cache(maxsize=256)
+def _render_tray_image(text: str, size: tuple, bg_color: str, text_color: str, font: Any) -> Any:
+    """
+    绘制托盘图标图像，只缓存成功的结果（失败时抛出异常，不会被缓存）
+    """
+    from PIL import Image, ImageDraw
+    
+    # 创建图像
+    image = Image.new('RGB', size, bg_color)
+    dc = ImageDraw.Draw(image)
+    
+    if font is None:
+        font = _get_tray_font()
+    
+    # 计算文本位置（居中）
+    left, top, right, bottom = font.getbbox(text)
+    text_width, text_height = right - left, bottom - top
+    position = ((size[0] - text_width) // 2 - left, (size[1] - text_height) // 2 - top)
+    
+    # 绘制文本
+    dc.text(position, text, fill=text_color, font=font)
+    
+    return image
+
 def get_resource_path(relative_path: str) -> str:
     """
     获取资源文件的绝对路径（支持PyInstaller打包）
@@ -176,9 +228,7 @@ def get_resource_path(relative_path: str) -> str:
 
 def validate_email(email: str) -> bool:
     """验证电子邮件格式（简单版）"""
-    import re
-    pattern = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 def clamp(value: Union[int, float], min_val: Union[int, float], max_val: Union[int, float]) -> Union[int, float]:
     """将值限制在[min_val, max_val]范围内"""
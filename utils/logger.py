@@ -7,9 +7,14 @@
 import logging
 import os
 import sys  # 添加这行导入语句
-from logging.handlers import RotatingFileHandler
+import queue
+import atexit
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from datetime import datetime
 
+# 后台写日志的监听线程（由 setup_logging 创建，shutdown_logging 停止）
+_listener = None
+
 def setup_logging(log_dir: str = "logs", log_level: str = "INFO", max_bytes: int = 5*1024*1024, backup_count: int = 5):
     """
     配置全局日志记录系统
@@ -18,22 +23,34 @@ def setup_logging(log_dir: str = "logs", log_level: str = "INFO", max_bytes: int
     :param log_level: 日志级别（DEBUG, INFO, WARNING, ERROR, CRITICAL）
     :param max_bytes: 单个日志文件最大字节数
     :param backup_count: 保留的备份日志文件数
+    
+    日志记录只在调用线程中放入队列，由后台监听线程统一写入文件和控制台
     """
+    global _listener
+    
     # 确保日志目录存在
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    os.makedirs(log_dir, exist_ok=True)
     
     # 设置日志文件名（带日期）
     log_filename = datetime.now().strftime("%Y-%m-%d_%H-%M-%S") + ".log"
     log_path = os.path.join(log_dir, log_filename)
     
+    # 日志级别只解析一次
+    level_int = logging.getLevelName(log_level.upper())
+    
+    # 格式中不包含线程/进程信息，关闭这些字段的采集以减少每条日志的开销
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    
     # 创建根记录器
     logger = logging.getLogger()
-    logger.setLevel(log_level.upper())
+    logger.setLevel(level_int)
     
-    # 清除现有处理器
+    # 清除现有处理器（并停止上一次配置的监听线程）
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+    shutdown_logging()
     
     # 创建文件处理器（带轮转）
     file_handler = RotatingFileHandler(
@@ -42,11 +59,11 @@ def setup_logging(log_dir: str = "logs", log_level: str = "INFO", max_bytes: int
         backupCount=backup_count,
         encoding='utf-8'
     )
-    file_handler.setLevel(log_level.upper())
+    file_handler.setLevel(level_int)
     
     # 创建控制台处理器
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(log_level.upper())
+    console_handler.setLevel(level_int)
     
     # 创建格式化器
     formatter = logging.Formatter(
@@ -58,9 +75,11 @@ def setup_logging(log_dir: str = "logs", log_level: str = "INFO", max_bytes: int
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
     
-    # 添加处理器
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # 根记录器只挂队列处理器，实际的文件/控制台输出由监听线程完成
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
     
     # 捕获未处理异常
     def handle_exception(exc_type, exc_value, exc_traceback):
@@ -74,6 +93,18 @@ def setup_logging(log_dir: str = "logs", log_level: str = "INFO", max_bytes: int
     
     return logger
 
+def shutdown_logging():
+    """停止后台日志监听线程，写出队列中剩余的日志并关闭其处理器"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+# 退出时确保队列中的日志写入完毕（先于 logging 自身的清理执行）
+atexit.register(shutdown_logging)
+
 def get_logger(name: str) -> logging.Logger:
     """
     获取具有指定名称的记录器
@@ -8,9 +8,29 @@ import logging
 import platform
 import time
 import threading
+import subprocess
+from collections import OrderedDict
 from win10toast import ToastNotifier
 from pystray import Icon
 
+# 运行平台（模块加载时确定一次）
+_SYSTEM = platform.system()
+_IS_WINDOWS = _SYSTEM == "Windows"
+_IS_DARWIN = _SYSTEM == "Darwin"
+
+if _IS_WINDOWS:
+    import winsound
+
+# macOS/Linux 播放告警声音的命令（直接执行，不经过shell）
+if _IS_DARWIN:
+    _SOUND_CMD = ["afplay", "/System/Library/Sounds/Ping.aiff"]
+else:
+    _SOUND_CMD = ["paplay", "/usr/share/sounds/freedesktop/stereo/complete.oga"]
+
+# 相同告警的去重时长（秒）及最多记录的告警条数
+ALERT_TTL = 300.0
+MAX_SENT_ALERTS = 1024
+
 class NotificationManager:
     def __init__(self, app_name: str = "硬件监控"):
         """
@@ -20,20 +40,23 @@ class NotificationManager:
         """
         self.logger = logging.getLogger("NotificationManager")
         self.app_name = app_name
-        self.sent_alerts = set()
+        # 已发送告警 -> 发送时间（按发送顺序排列，过期后允许再次通知）
+        self.sent_alerts = OrderedDict()
+        self._alert_ttl = ALERT_TTL
+        self._alerts_lock = threading.Lock()
         self.sound_enabled = True
         self.tray_icon = None
         
         # 初始化平台相关通知
         self.toaster = None
-        if platform.system() == "Windows":
+        if _IS_WINDOWS:
             try:
                 self.toaster = ToastNotifier()
             except Exception as e:
-                self.logger.error(f"初始化通知系统失败: {str(e)}")
+                self.logger.error("初始化通知系统失败: %s", e)
                 self.toaster = None
         
-        self.logger.info(f"通知管理器初始化完成，系统: {platform.system()}")
+        self.logger.info("通知管理器初始化完成，系统: %s", _SYSTEM)
 
     def send_alert(self, message: str, duration: int = 10):
         """
@@ -45,13 +68,18 @@ class NotificationManager:
         if not message:
             return
             
-        # 避免重复通知
-        if message in self.sent_alerts:
-            self.logger.debug(f"跳过重复通知: {message}")
-            return
+        # 避免短时间内重复通知
+        now = time.monotonic()
+        with self._alerts_lock:
+            self._expire_alerts(now)
+            if message in self.sent_alerts:
+                self.logger.debug("跳过重复通知: %s", message)
+                return
+            self.sent_alerts[message] = now
+            while len(self.sent_alerts) > MAX_SENT_ALERTS:
+                self.sent_alerts.popitem(last=False)
             
-        self.logger.info(f"发送通知: {message}")
-        self.sent_alerts.add(message)
+        self.logger.info("发送通知: %s", message)
         
         # 发送系统通知
         if self.toaster:
@@ -63,7 +91,7 @@ class NotificationManager:
                     threaded=True
                 )
             except Exception as e:
-                self.logger.error(f"发送通知失败: {str(e)}")
+                self.logger.error("发送通知失败: %s", e)
         
         # 播放声音提示
         if self.sound_enabled:
@@ -73,28 +101,39 @@ class NotificationManager:
         if self.tray_icon:
             self.blink_tray_icon(message)
 
+    def _expire_alerts(self, now: float):
+        """
+        移除超过去重时长的告警记录（调用方需持有 _alerts_lock）
+        
+        :param now: 当前时间（time.monotonic()）
+        """
+        cutoff = now - self._alert_ttl
+        while self.sent_alerts and next(iter(self.sent_alerts.values())) < cutoff:
+            self.sent_alerts.popitem(last=False)
+
     def reset_alerts(self):
         """重置已发送的告警记录"""
-        self.sent_alerts.clear()
+        with self._alerts_lock:
+            self.sent_alerts.clear()
         self.logger.info("已重置通知记录")
 
     def play_alert_sound(self):
         """播放告警声音"""
         try:
             # Windows系统播放默认声音
-            if platform.system() == "Windows":
-                import winsound
+            if _IS_WINDOWS:
                 winsound.MessageBeep(winsound.MB_ICONWARNING)
-            # macOS系统
-            elif platform.system() == "Darwin":
-                import os
-                os.system('afplay /System/Library/Sounds/Ping.aiff &')
-            # Linux系统
+            # macOS/Linux系统：后台播放，不等待播放结束
             else:
-                import os
-                os.system('paplay /usr/share/sounds/freedesktop/stereo/complete.oga &')
+                subprocess.Popen(
+                    _SOUND_CMD,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True
+                )
         except Exception as e:
-            self.logger.error(f"播放声音失败: {str(e)}")
+            self.logger.error("播放声音失败: %s", e)
 
     def set_tray_icon(self, tray_icon: Icon):
         """设置托盘图标引用（用于闪烁效果）"""
@@ -125,7 +164,7 @@ class NotificationManager:
                     self.tray_icon.title = self.app_name
                     time.sleep(interval)
                 except Exception as e:
-                    self.logger.error(f"闪烁托盘图标失败: {str(e)}")
+                    self.logger.error("闪烁托盘图标失败: %s", e)
                     break
             
             # 恢复原始状态
@@ -151,7 +190,7 @@ class NotificationManager:
     def enable_sound(self, enabled: bool):
         """启用或禁用声音提示"""
         self.sound_enabled = enabled
-        self.logger.info(f"声音提示 {'启用' if enabled else '禁用'}")
+        self.logger.info("声音提示 %s", '启用' if enabled else '禁用')
 
 # 测试通知功能
 if __name__ == "__main__":